@@ -14,6 +14,38 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     PARKING_HOURLY_RATE: int = 20
     CREDIT_LIMIT: int = 100
+    # Written on every profile change, so it is kept out of the source tree
+    CAMERA_PROFILES_PATH: str = "data/camera_profiles.json"
+    OCR_BATCH_MAX_DELAY_MS: float = 5.0
+    OCR_BATCH_MAX_GLYPHS: int = 64
+    ADMISSION_TOTAL_SLOTS: int = 8
+    ADMISSION_GATE_LIMIT: int = 8
+    ADMISSION_AUTH_LIMIT: int = 2
+    ADMISSION_REPORT_LIMIT: int = 2
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT: float = 2.0
+    ADMISSION_RETRY_AFTER: int = 1
+    ACTIVE_SESSIONS_RECONCILE_SECONDS: float = 60.0
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    STREAM_FETCH_SIZE: int = 1000
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_RETENTION_MONTHS: int = 24
+    PARTITION_MAINTENANCE_SECONDS: float = 24 * 60 * 60
+    # Requires pyarrow, installed with the `archive` extra
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVE_MAINTENANCE_SECONDS: float = 24 * 60 * 60
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 60 * 60
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+    GATE_DEBOUNCE_SECONDS: float = 10.0
+    GATE_DEBOUNCE_MAX_PLATES: int = 10000
+    PARKING_EVENTS_BATCH_MAX: int = 1000
+    SESSION_MAX_DURATION_HOURS: float = 72.0
+    SESSION_MAX_CHARGE_HOURS: float = 24.0
+    SESSION_SWEEP_BATCH_SIZE: int = 500
+    SESSION_SWEEP_SECONDS: float = 15 * 60
+    TARIFF_SIMULATION_FETCH_SIZE: int = 50000
 
     class Config:
         env_file = ".env"
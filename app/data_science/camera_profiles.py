@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+from app.core.config import settings
+from app.schemas.cameras import CameraProfile
+
+
+DEFAULT_CAMERA_ID = "default"
+
+
+class CameraProfileRegistry:
+    """
+    Registry of per-camera detection profiles, keyed by the camera id sent with the upload.
+
+    Profiles are loaded from a JSON file (a list of profile objects) and written back on every change.
+    Unknown or missing camera ids fall back to the default full-frame profile.
+    """
+
+    def __init__(self, profiles_path=settings.CAMERA_PROFILES_PATH):
+        self.profiles_path = Path(profiles_path)
+        self.default_profile = CameraProfile(camera_id=DEFAULT_CAMERA_ID)
+        self.profiles: dict[str, CameraProfile] = {}
+        self.load()
+
+    def load(self) -> None:
+        """
+        Loads profiles from the JSON file, if it exists.
+        """
+        if not self.profiles_path.exists():
+            return
+        with open(self.profiles_path, encoding="utf-8") as profiles_file:
+            data = json.load(profiles_file)
+        self.profiles = {item["camera_id"]: CameraProfile(**item) for item in data}
+
+    def save(self) -> None:
+        """
+        Writes all registered profiles to the JSON file.
+        """
+        self.profiles_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.profiles_path, "w", encoding="utf-8") as profiles_file:
+            json.dump([profile.model_dump() for profile in self.profiles.values()], profiles_file, indent=2)
+
+    def get(self, camera_id: str | None) -> CameraProfile:
+        """
+        Returns the profile for the given camera, or the default profile if none is registered.
+        """
+        if camera_id is None:
+            return self.default_profile
+        return self.profiles.get(camera_id, self.default_profile)
+
+    def all(self) -> list[CameraProfile]:
+        return list(self.profiles.values())
+
+    def upsert(self, profile: CameraProfile) -> CameraProfile:
+        """
+        Registers or replaces a camera profile and persists the registry.
+        """
+        self.profiles[profile.camera_id] = profile
+        self.save()
+        return profile
+
+    def delete(self, camera_id: str) -> CameraProfile | None:
+        """
+        Removes a camera profile and persists the registry.
+        """
+        profile = self.profiles.pop(camera_id, None)
+        if profile is not None:
+            self.save()
+        return profile
+
+
+camera_profiles = CameraProfileRegistry()
@@ -3,6 +3,9 @@ import numpy as np
 import tensorflow as tf
 
 
+CHARACTERS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
 class CharacterRecognizer:
     def __init__(self, model_path="app/ds_models/plate_detect_model_best.tflite"):
         self.interpreter = tf.lite.Interpreter(model_path=model_path)
@@ -18,34 +21,61 @@ class CharacterRecognizer:
         return new_img
 
     def predict_image(self, img_array):
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = img_array.astype(np.float32) / 255.0
-        self.interpreter.set_tensor(self.input_details[0]['index'], img_array)
+        return self.predict_batch(np.expand_dims(img_array, axis=0))[0]
+
+    def predict_batch(self, img_arrays):
+        # Змінюємо розмір вхідного тензора лише тоді, коли змінюється розмір пакета
+        input_index = self.input_details[0]['index']
+        if self.input_details[0]['shape'][0] != len(img_arrays):
+            self.interpreter.resize_tensor_input(input_index, [len(img_arrays), 28, 28, 1])
+            self.interpreter.allocate_tensors()
+            self.input_details = self.interpreter.get_input_details()
+            self.output_details = self.interpreter.get_output_details()
+
+        img_arrays = img_arrays.astype(np.float32) / 255.0
+        self.interpreter.set_tensor(input_index, img_arrays)
         self.interpreter.invoke()
         output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
 
-        return np.argmax(output_data, axis=1)[0]
-
-    def segment_characters(self, chars):
-        dic = {}
-        characters = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        for i, c in enumerate(characters):
-            dic[i] = c
+        return np.argmax(output_data, axis=1)
 
-        output = []
+    @staticmethod
+    def prepare_characters(chars):
+        glyphs = []
         for ch in chars:  # iterating over the characters
             img_ = cv2.resize(ch, (28, 28), interpolation=cv2.INTER_AREA)
-            img = self.fix_dimension(img_)
-            img = img.reshape(28, 28, 1)
+            img = CharacterRecognizer.fix_dimension(img_)
+            glyphs.append(img.reshape(28, 28, 1))
+        if not glyphs:
+            return np.empty((0, 28, 28, 1))
+        return np.stack(glyphs)
+
+    @staticmethod
+    def decode(indices):
+        return ''.join(CHARACTERS[i] for i in indices)  # визначаємо символи за індексами
+
+    def segment_characters(self, chars):
+        return self.recognize_plates([chars])[0]
+
+    def recognize_plates(self, chars_lists):
+        if not chars_lists:
+            return []
 
-            y_ = self.predict_image(img)
+        # Розпізнаємо символи всіх номерів за один виклик моделі
+        glyphs_per_plate = [self.prepare_characters(chars) for chars in chars_lists]
+        glyphs = np.concatenate(glyphs_per_plate)
+        if not len(glyphs):
+            return ['' for _ in chars_lists]
 
-            character = dic[y_]  # визначаємо символ за індексом
-            output.append(character)  # зберігаємо результат у список
+        predictions = self.predict_batch(glyphs)
 
-        plate_number = ''.join(output)
+        plate_numbers = []
+        position = 0
+        for plate_glyphs in glyphs_per_plate:
+            plate_numbers.append(self.decode(predictions[position:position + len(plate_glyphs)]))
+            position += len(plate_glyphs)
 
-        return plate_number
+        return plate_numbers
 
 
 character_recognizer = CharacterRecognizer()
@@ -1,17 +1,43 @@
 import cv2
 import numpy as np
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from app.data_science.character_recogniser import character_recognizer
+from app.data_science.camera_profiles import camera_profiles
+from app.data_science.character_recogniser import CharacterRecognizer
 from app.data_science.license_plate_detector import plate_detector
+from app.data_science.ocr_batcher import ocr_batcher
 
 
-def detector(img):
+def decode_image(img):
     img_array = np.frombuffer(img, np.uint8)
     img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
     if img is None:
         raise HTTPException(status_code=400, detail="Could not load image. Please verify the path.")
-    plate = plate_detector.detect_plate(img)
+    return img
+
+
+def plate_glyphs(img, camera_id=None):
+    img = decode_image(img)
+    plate = plate_detector.detect_plate(img, camera_profiles.get(camera_id))
     chars_list = plate_detector.segment_characters(plate)
-    plate_text = character_recognizer.segment_characters(chars_list)
+    return CharacterRecognizer.prepare_characters(chars_list)
+
+
+def plates_glyphs(img, camera_id=None):
+    img = decode_image(img)
+    plates = plate_detector.detect_plates(img, camera_profiles.get(camera_id))
+    return [CharacterRecognizer.prepare_characters(plate_detector.segment_characters(plate)) for plate in plates]
+
+
+async def detector(img, camera_id=None):
+    # Детекцію виконуємо в потоці, а розпізнавання символів об'єднуємо з паралельними запитами
+    glyphs = await run_in_threadpool(plate_glyphs, img, camera_id)
+    plate_text, = await ocr_batcher.recognize_plates([glyphs])
     return plate_text
+
+
+async def multi_detector(img, camera_id=None):
+    glyphs_per_plate = await run_in_threadpool(plates_glyphs, img, camera_id)
+    plate_texts = await ocr_batcher.recognize_plates(glyphs_per_plate)
+    return [plate_text for plate_text in plate_texts if plate_text]
@@ -1,48 +1,86 @@
+import threading
+
 import cv2
 import numpy as np
 
+from app.data_science.camera_profiles import camera_profiles
+
 
 class LicensePlateDetector:
     def __init__(self, cascade_path="app/ds_models/indian_license_plate.xml"):
-        self.plate_cascade = cv2.CascadeClassifier(cascade_path)
-
-    def detect_plate(self, img):
-        plate_img = img.copy()
-        roi = img.copy()
-        plate_rect = self.plate_cascade.detectMultiScale(plate_img, scaleFactor=1.2, minNeighbors=7)
+        self.cascade_path = cascade_path
+        self.local = threading.local()
+
+    @property
+    def plate_cascade(self):
+        # CascadeClassifier не є потокобезпечним, тому кожен потік пулу завантажує власну копію
+        cascade = getattr(self.local, "plate_cascade", None)
+        if cascade is None:
+            cascade = self.local.plate_cascade = cv2.CascadeClassifier(self.cascade_path)
+        return cascade
+
+    def find_plate_rects(self, img, profile=None):
+        profile = profile or camera_profiles.default_profile
+
+        # Шукаємо номер лише в зоні інтересу камери, якщо вона задана у профілі
+        offset_x, offset_y = 0, 0
+        search_img = img
+        if profile.roi:
+            x, y, w, h = profile.roi
+            offset_x, offset_y = min(x, img.shape[1]), min(y, img.shape[0])
+            search_img = img[offset_y:offset_y + h, offset_x:offset_x + w]
+
+        scale_kwargs = {}
+        if profile.min_plate_size:
+            scale_kwargs["minSize"] = tuple(profile.min_plate_size)
+        if profile.max_plate_size:
+            scale_kwargs["maxSize"] = tuple(profile.max_plate_size)
+
+        plate_rect = self.plate_cascade.detectMultiScale(
+            search_img,
+            scaleFactor=profile.scale_factor,
+            minNeighbors=profile.min_neighbors,
+            **scale_kwargs,
+        )
+
+        min_ratio = profile.min_ratio  # Мінімальне допустиме співвідношення ширини до висоти
+        max_ratio = profile.max_ratio  # Максимальне допустиме співвідношення ширини до висоти
+
+        # Залишаємо лише прямокутники у межах допустимого співвідношення сторін
+        return [
+            (x + offset_x, y + offset_y, w, h)
+            for (x, y, w, h) in plate_rect
+            if min_ratio <= w / h <= max_ratio
+        ]
 
-        best_plate = None
-        max_width = 0
-        min_ratio = 2.0  # Мінімальне допустиме співвідношення ширини до висоти
-        max_ratio = 8.0  # Максимальне допустиме співвідношення ширини до висоти
-
-        for (x, y, w, h) in plate_rect:
-            ratio = w / h
-
-            # Вибираємо найширший прямокутник у межах допустимого співвідношення сторін
-            if min_ratio <= ratio <= max_ratio and w > max_width:
-                max_width = w
-                best_plate = (x, y, w, h)
+    @staticmethod
+    def crop_plate(img, plate_rect):
+        x, y, w, h = plate_rect
 
-            cv2.rectangle(plate_img, (x + 2, y), (x + w - 3, y + h - 5), (51, 181, 155), 3)
+        # Розширюємо прямокутник
+        expansion_factor = 0.5  # Збільшуємо ширину на 50%
+        new_w = int(w * (1 + expansion_factor))
+        new_x = max(0, x - (new_w - w) // 2)
 
-        if best_plate:
-            x, y, w, h = best_plate
+        # Переконуємося, що розширений прямокутник не виходить за межі зображення
+        new_x = min(new_x, img.shape[1] - new_w)
 
-            # Розширюємо прямокутник
-            expansion_factor = 0.5  # Збільшуємо ширину на 50%
-            new_w = int(w * (1 + expansion_factor))
-            new_x = max(0, x - (new_w - w) // 2)
+        return img[y:y + h, new_x:new_x + new_w, :].copy()
 
-            # Переконуємося, що розширений прямокутник не виходить за межі зображення
-            new_x = min(new_x, img.shape[1] - new_w)
+    def detect_plate(self, img, profile=None):
+        plate_rects = self.find_plate_rects(img, profile)
+        if not plate_rects:
+            return None
 
-            plate = roi[y:y + h, new_x:new_x + new_w, :]
+        # Вибираємо найширший прямокутник
+        best_plate = max(plate_rects, key=lambda rect: rect[2])
+        return self.crop_plate(img, best_plate)
 
-        else:
-            plate = None
+    def detect_plates(self, img, profile=None):
+        plate_rects = self.find_plate_rects(img, profile)
 
-        return plate
+        # Повертаємо всі знайдені номери зліва направо
+        return [self.crop_plate(img, rect) for rect in sorted(plate_rects, key=lambda rect: rect[0])]
 
     @staticmethod
     def find_contours(dimensions, img):
@@ -133,7 +171,6 @@ class LicensePlateDetector:
                       2 * LP_HEIGHT / 3]
         # plt.imshow(img_binary_lp, cmap='gray')
         # plt.show()
-        cv2.imwrite('contour.jpg', img_binary_lp)
 
         # Get contours within cropped license plate
         char_list = self.find_contours(dimensions, img_binary_lp)
@@ -0,0 +1,113 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.core.config import settings
+from app.data_science.character_recogniser import CharacterRecognizer, character_recognizer
+
+
+class OCRBatcher:
+    """
+    Micro-batching scheduler in front of CharacterRecognizer.
+
+    Glyphs submitted by concurrent requests are collected for up to `max_delay_ms` milliseconds
+    or until `max_glyphs` glyphs are pending, then recognized with a single interpreter invocation.
+    The predictions are scattered back to the waiting callers. Inference runs on a single worker
+    thread, because the TFLite interpreter is not thread-safe and must not block the event loop.
+    """
+
+    def __init__(
+            self,
+            recognizer: CharacterRecognizer,
+            max_delay_ms: float = settings.OCR_BATCH_MAX_DELAY_MS,
+            max_glyphs: int = settings.OCR_BATCH_MAX_GLYPHS,
+    ):
+        self.recognizer = recognizer
+        self.max_delay = max_delay_ms / 1000
+        self.max_glyphs = max_glyphs
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        self.pending: list[tuple[np.ndarray, asyncio.Future]] = []
+        self.pending_glyphs = 0
+        self.flush_timer: asyncio.TimerHandle | None = None
+        self.running: set[asyncio.Task] = set()
+
+    async def predict(self, glyphs: np.ndarray) -> np.ndarray:
+        """
+        Predicts character indices for the glyphs, batching them with glyphs of concurrent callers.
+
+        Args:
+            glyphs (np.ndarray): Prepared glyph tensors of shape (n, 28, 28, 1).
+
+        Returns:
+            np.ndarray: The predicted character index for every glyph.
+        """
+        if not len(glyphs):
+            return np.empty(0, dtype=np.int64)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((glyphs, future))
+        self.pending_glyphs += len(glyphs)
+
+        if self.pending_glyphs >= self.max_glyphs:
+            self.flush()
+        elif self.flush_timer is None:
+            self.flush_timer = loop.call_later(self.max_delay, self.flush)
+
+        return await future
+
+    async def recognize_plates(self, glyphs_per_plate: list[np.ndarray]) -> list[str]:
+        """
+        Recognizes the plate numbers of the prepared glyphs of several plates.
+
+        Args:
+            glyphs_per_plate (list[np.ndarray]): Prepared glyph tensors of every plate.
+
+        Returns:
+            list[str]: The recognized number of every plate.
+        """
+        if not glyphs_per_plate:
+            return []
+        predictions = await self.predict(np.concatenate(glyphs_per_plate))
+
+        plate_numbers = []
+        position = 0
+        for plate_glyphs in glyphs_per_plate:
+            plate_numbers.append(self.recognizer.decode(predictions[position:position + len(plate_glyphs)]))
+            position += len(plate_glyphs)
+        return plate_numbers
+
+    def flush(self) -> None:
+        """
+        Sends all pending glyphs to the interpreter as one batch.
+        """
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+
+        batch, self.pending, self.pending_glyphs = self.pending, [], 0
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run(self, batch: list[tuple[np.ndarray, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        glyphs = np.concatenate([request_glyphs for request_glyphs, _ in batch])
+        try:
+            predictions = await loop.run_in_executor(self.executor, self.recognizer.predict_batch, glyphs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        position = 0
+        for request_glyphs, future in batch:
+            if not future.done():
+                future.set_result(predictions[position:position + len(request_glyphs)])
+            position += len(request_glyphs)
+
+
+ocr_batcher = OCRBatcher(character_recognizer)
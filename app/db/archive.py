@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from sqlalchemy import Boolean, DateTime, Float, Integer, String, Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.partitions import PARTITION_NAME, PARTITIONED_TABLES, PartitionedTable
+from app.models import Base
+
+# pyarrow is only needed where archiving is enabled
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+ARROW_TYPES = {
+    Integer: lambda: pa.int64(),
+    Float: lambda: pa.float64(),
+    Boolean: lambda: pa.bool_(),
+    DateTime: lambda: pa.timestamp("us"),
+    String: lambda: pa.string(),
+}
+
+
+def arrow_schema(table: Table) -> "pa.Schema":
+    fields = []
+    for column in table.columns:
+        arrow_type = next(make() for sa_type, make in ARROW_TYPES.items() if isinstance(column.type, sa_type))
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+class ColdArchive:
+    """
+    Moves detached monthly partitions out of Postgres into zstd-compressed Parquet files.
+
+    The partition manager detaches partitions once they are past retention and hold no active
+    sessions. Each detached partition is written to `<root>/<table>/month=YYYY-MM/<table>.parquet`
+    and then dropped. Archived rows are read back by car, for the history endpoints that ask for
+    archived data.
+    """
+
+    def __init__(
+            self,
+            root: str = settings.ARCHIVE_DIR,
+            tables: list[PartitionedTable] = PARTITIONED_TABLES,
+            enabled: bool = settings.ARCHIVE_ENABLED,
+    ):
+        self.root = Path(root)
+        self.tables = tables
+        self.enabled = enabled
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    def check_available(self) -> None:
+        """
+        Fails startup when archiving is enabled without pyarrow, instead of leaving detached
+        partitions to pile up in the database.
+        """
+        if self.enabled and not self.available:
+            raise RuntimeError(
+                "pyarrow is required to archive partitions: install the `archive` extra or set ARCHIVE_ENABLED=false"
+            )
+
+    def month_path(self, table: str, partition: str) -> Path:
+        match = PARTITION_NAME.search(partition)
+        return self.root / table / f"month={match[1]}-{match[2]}" / f"{table}.parquet"
+
+    @staticmethod
+    async def detached_partitions(conn: AsyncConnection, table: PartitionedTable) -> list[str]:
+        result = await conn.execute(
+            text(
+                "SELECT relname FROM pg_class "
+                "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND relname LIKE :prefix "
+                "AND NOT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = pg_class.oid) "
+                "ORDER BY relname"
+            ),
+            {"prefix": f"{table.name}\\_y%"},
+        )
+        return [name for name in result.scalars().all() if PARTITION_NAME.search(name)]
+
+    async def archive_partition(self, conn: AsyncConnection, table: PartitionedTable, partition: str) -> bool:
+        """
+        Writes one detached partition to Parquet and drops it, within the connection's transaction.
+
+        The file is written under a temporary name and renamed once complete, so a failed run leaves
+        no partial archive and the partition is archived again on the next run.
+
+        Returns:
+            bool: Whether the partition was archived; False if another worker is archiving it.
+        """
+        # Serialises workers on the partition; the loser finds it gone or locked and skips it
+        locked = await conn.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext(:name))"), {"name": partition})
+        if not locked or await conn.scalar(text("SELECT to_regclass(:name)"), {"name": partition}) is None:
+            return False
+
+        schema = arrow_schema(Base.metadata.tables[table.name])
+        # Partitions detached before a column was added lack it; it is archived as nulls
+        result = await conn.execute(
+            text("SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(:name) AND attnum > 0 AND NOT attisdropped"),
+            {"name": partition},
+        )
+        columns = [name for name in schema.names if name in set(result.scalars().all())]
+        path = self.month_path(table.name, partition)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Dot-prefixed files are ignored when the archive is read
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+        try:
+            result = await conn.stream(text(f"SELECT {', '.join(columns)} FROM {partition} ORDER BY id"))
+            async for rows in result.mappings().partitions(settings.STREAM_FETCH_SIZE):
+                batch = pa.RecordBatch.from_pylist([dict(row) for row in rows], schema=schema)
+                await asyncio.to_thread(writer.write_batch, batch)
+        finally:
+            writer.close()
+        os.replace(tmp_path, path)
+
+        await conn.execute(text(f"DROP TABLE {partition}"))
+        return True
+
+    async def run(self) -> list[str]:
+        """
+        Archives all detached partitions of the partitioned tables.
+
+        Returns:
+            list[str]: The names of the partitions that were archived.
+        """
+        archived = []
+        for table in self.tables:
+            async with engine.connect() as conn:
+                partitions = await self.detached_partitions(conn, table)
+            for partition in partitions:
+                # One transaction per partition, so a failure does not undo the others
+                async with engine.begin() as conn:
+                    if await self.archive_partition(conn, table, partition):
+                        archived.append(partition)
+        return archived
+
+    async def run_forever(self, interval: float = settings.ARCHIVE_MAINTENANCE_SECONDS) -> None:
+        """
+        Archives detached partitions every `interval` seconds until cancelled.
+        """
+        if not self.enabled:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                archived = await self.run()
+                if archived:
+                    logging.info(f"Archived partitions: {archived}")
+            except Exception as e:
+                logging.error(f"Error archiving partitions: {e}")
+
+    def read_by_car_ids(self, table: str, car_ids: list[int]) -> list[dict]:
+        """
+        Reads the archived rows of the given cars from all archived months, in ID order.
+
+        Args:
+            table (str): The name of the archived table.
+            car_ids (list[int]): The IDs of the cars.
+
+        Returns:
+            list[dict]: The archived rows as dictionaries of the table's columns.
+        """
+        root = self.root / table
+        if not car_ids or not root.is_dir():
+            return []
+        if not self.available:
+            raise RuntimeError("pyarrow is required to read archived data")
+        # Reading with the current schema fills columns missing from older archives with nulls
+        schema = arrow_schema(Base.metadata.tables[table])
+        dataset = ds.dataset(root, schema=schema, format="parquet", partitioning="hive")
+        rows = dataset.to_table(columns=schema.names, filter=ds.field("car_id").isin(car_ids))
+        return rows.sort_by("id").to_pylist()
+
+    async def find_by_car_ids(self, table: str, car_ids: list[int]) -> list[dict]:
+        return await asyncio.to_thread(self.read_by_car_ids, table, car_ids)
+
+
+cold_archive = ColdArchive()
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+from app.db.database import engine
+
+
+@dataclass
+class PartitionedTable:
+    name: str
+    # The column the table is range partitioned by
+    key: str
+    # A partition is never detached while any of its rows matches this condition
+    keep_condition: str | None = None
+
+
+PARTITIONED_TABLES = [
+    PartitionedTable("parkings", "start_time", keep_condition="is_active"),
+    PartitionedTable("payments", "payment_date"),
+]
+
+PARTITION_NAME = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+class PartitionManager:
+    """
+    Maintains the monthly range partitions of the partitioned tables.
+
+    Partitions are created `months_ahead` months in advance, so inserts never fall into the default
+    partition. Partitions older than `retention_months` are detached: they stay in the database as
+    plain tables for archival, but period queries and vacuum no longer touch them. Every worker runs
+    the maintenance; an advisory lock lets only one of them change the partitions at a time.
+    """
+
+    def __init__(
+            self,
+            tables: list[PartitionedTable] = PARTITIONED_TABLES,
+            months_ahead: int = settings.PARTITION_MONTHS_AHEAD,
+            retention_months: int = settings.PARTITION_RETENTION_MONTHS,
+    ):
+        self.tables = tables
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+
+    async def create_partitions(self, conn: AsyncConnection, table: PartitionedTable, today: date) -> list[str]:
+        """
+        Creates the missing partitions from the current month up to `months_ahead` months ahead.
+
+        Rows of the month that already fell into the default partition are moved to the new
+        partition before it is attached, as attaching fails while the default partition holds them.
+
+        Returns:
+            list[str]: The names of the partitions that were created.
+        """
+        existing = set(await self.partitions(conn, table))
+        created = []
+        current = date(today.year, today.month, 1)
+        for offset in range(self.months_ahead + 1):
+            month = add_months(current, offset)
+            name = partition_name(table.name, month)
+            if name in existing:
+                continue
+            bounds = f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            in_range = f"{table.key} >= '{month.isoformat()}' AND {table.key} < '{add_months(month, 1).isoformat()}'"
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} (LIKE {table.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            await conn.execute(text(
+                f"WITH moved AS (DELETE FROM {table.name}_default WHERE {in_range} RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ))
+            await conn.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {name} FOR VALUES {bounds}"))
+            created.append(name)
+        return created
+
+    async def detach_partitions(self, conn: AsyncConnection, table: PartitionedTable, today: date) -> list[str]:
+        """
+        Detaches the partitions that ended more than `retention_months` months ago.
+
+        Returns:
+            list[str]: The names of the partitions that were detached.
+        """
+        cutoff = add_months(date(today.year, today.month, 1), -self.retention_months)
+        detached = []
+        for name in await self.partitions(conn, table):
+            match = PARTITION_NAME.search(name)
+            if match is None or date(int(match[1]), int(match[2]), 1) >= cutoff:
+                continue
+            if table.keep_condition is not None:
+                in_use = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE {table.keep_condition})"))
+                if in_use:
+                    logging.warning(f"Partition {name} is past retention but still in use, not detached")
+                    continue
+            await conn.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+            detached.append(name)
+        return detached
+
+    @staticmethod
+    async def partitions(conn: AsyncConnection, table: PartitionedTable) -> list[str]:
+        result = await conn.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :table ORDER BY child.relname"
+            ),
+            {"table": table.name},
+        )
+        return list(result.scalars().all())
+
+    async def run(self, today: date | None = None) -> dict[str, list[str]]:
+        """
+        Creates upcoming partitions and detaches expired ones for all partitioned tables.
+
+        Returns:
+            dict[str, list[str]]: The created and detached partition names; empty if another worker
+            is maintaining the partitions.
+        """
+        today = today or date.today()
+        changes = {"created": [], "detached": []}
+        async with engine.begin() as conn:
+            # Serialises workers; the loser skips this run and finds the partitions in place next time
+            locked = await conn.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext('partition_maintenance'))"))
+            if not locked:
+                return changes
+            for table in self.tables:
+                changes["created"] += await self.create_partitions(conn, table, today)
+                changes["detached"] += await self.detach_partitions(conn, table, today)
+        return changes
+
+    async def run_forever(self, interval: float = settings.PARTITION_MAINTENANCE_SECONDS) -> None:
+        """
+        Runs the partition maintenance now and then every `interval` seconds until cancelled.
+        """
+        while True:
+            try:
+                changes = await self.run()
+                if changes["created"] or changes["detached"]:
+                    logging.info(f"Partition maintenance: {changes}")
+            except Exception as e:
+                logging.error(f"Error maintaining partitions: {e}")
+            await asyncio.sleep(interval)
+
+
+partition_manager = PartitionManager()
@@ -0,0 +1,141 @@
+"""
+Query plan check for the hot repository methods.
+
+Every checked method is run against the configured database inside a transaction that is rolled
+back. The SQL it sends is captured and explained with sequential scans disabled, and the check
+fails if any of the expected tables is still read with a sequential scan, which means no index
+can serve the query. Run it after migrations with:
+
+    python -m app.db.query_plans
+"""
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from sqlalchemy import event, text
+
+from app.db.database import engine
+from app.db.partitions import PARTITION_NAME
+from app.utils.unitofwork import UnitOfWork
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    run: Callable[[UnitOfWork], Awaitable]
+    tables: tuple[str, ...]
+
+
+PLAN_CHECKS = [
+    PlanCheck("cars.find_by_owner_id", lambda uow: uow.cars.find_by_owner_id(1), ("cars",)),
+    PlanCheck("parkings.find_by_car_id", lambda uow: uow.parkings.find_by_car_id(1), ("parkings",)),
+    PlanCheck(
+        "parkings.find_by_period",
+        lambda uow: uow.parkings.find_by_period(datetime.now(), limit=50),
+        ("parkings",),
+    ),
+    PlanCheck("parkings.find_by_owner_id", lambda uow: uow.parkings.find_by_owner_id(1), ("cars", "parkings")),
+    PlanCheck("parkings.find_entry_state", lambda uow: uow.parkings.find_entry_state("AA0000AA"), ("cars", "black_list")),
+    PlanCheck("parkings.close_active", lambda uow: uow.parkings.close_active(1, datetime.now()), ("parkings",)),
+    PlanCheck("payments.find_by_car_id", lambda uow: uow.payments.find_by_car_id(1), ("payments",)),
+    PlanCheck(
+        "payments.find_by_period",
+        lambda uow: uow.payments.find_by_period(datetime.now(), limit=50),
+        ("payments",),
+    ),
+    PlanCheck("payments.find_by_owner_id", lambda uow: uow.payments.find_by_owner_id(1), ("cars", "payments")),
+    PlanCheck(
+        "transactions.find_by_user_id",
+        lambda uow: uow.transactions.find_by_user_id(1, limit=50),
+        ("transactions",),
+    ),
+    PlanCheck("black_list.find_one_or_none", lambda uow: uow.black_list.find_one_or_none(car_id=1), ("black_list",)),
+]
+
+
+def parent_table(relation: str) -> str:
+    """
+    Returns the partitioned table a monthly or default partition belongs to, or the relation itself.
+    """
+    if relation.endswith("_default"):
+        return relation[:-len("_default")]
+    match = PARTITION_NAME.search(relation)
+    return relation[:match.start()] if match else relation
+
+
+def seq_scanned_tables(plan: dict) -> set[str]:
+    """
+    Returns the tables read with a sequential scan anywhere in an EXPLAIN (FORMAT JSON) plan node.
+
+    Scans of partitions are reported under their partitioned table, as the checks name those.
+    """
+    tables = set()
+    if plan.get("Node Type") == "Seq Scan":
+        tables.add(parent_table(plan["Relation Name"]))
+    for child in plan.get("Plans", []):
+        tables |= seq_scanned_tables(child)
+    return tables
+
+
+async def capture_statements(check: PlanCheck) -> list[tuple[str, tuple]]:
+    """
+    Runs a checked method in a rolled back transaction and returns the SQL statements it executed.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    uow = UnitOfWork()
+    try:
+        async with uow:
+            await check.run(uow)
+            await uow.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+async def explain(statement: str, parameters: tuple) -> dict:
+    async with engine.connect() as conn:
+        await conn.execute(text("SET enable_seqscan = off"))
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()
+        await conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def check_query_plans(checks: list[PlanCheck] = PLAN_CHECKS) -> list[str]:
+    """
+    Runs all plan checks.
+
+    Returns:
+        list[str]: A description of every failed check; empty if all checked queries use indexes.
+    """
+    failures = []
+    for check in checks:
+        for statement, parameters in await capture_statements(check):
+            scanned = seq_scanned_tables(await explain(statement, parameters)) & set(check.tables)
+            if scanned:
+                failures.append(f"{check.name}: sequential scan on {', '.join(sorted(scanned))}")
+    return failures
+
+
+async def main() -> int:
+    failures = await check_query_plans()
+    for failure in failures:
+        print(failure)
+    if not failures:
+        print(f"All {len(PLAN_CHECKS)} checked queries use indexes")
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -1,9 +1,44 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 import uvicorn
 from fastapi import FastAPI
 
+from app.db.archive import cold_archive
+from app.db.partitions import partition_manager
 from app.routers.all import all_routers
+from app.services.active_sessions import active_sessions
+from app.services.session_sweeper import session_sweeper
+from app.utils.idempotency import IdempotencyMiddleware, idempotency_store
+from app.utils.unitofwork import UnitOfWork
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    cold_archive.check_available()
+    # Seed the active-session index and keep it reconciled with the database
+    try:
+        await active_sessions.reload(UnitOfWork())
+    except Exception as e:
+        logging.error(f"Error loading active parking sessions: {e}")
+    background_tasks = [
+        asyncio.create_task(active_sessions.reconcile_forever()),
+        asyncio.create_task(partition_manager.run_forever()),
+        asyncio.create_task(cold_archive.run_forever()),
+        asyncio.create_task(session_sweeper.run_forever()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    for task in background_tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+# Retried parking and transaction mutations replay the original response
+app.add_middleware(IdempotencyMiddleware, store=idempotency_store, prefixes=("/parking/", "/transactions/"))
 
 
 for router in all_routers:
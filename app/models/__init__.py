@@ -2,6 +2,7 @@ from .base import Base
 from .users import User
 from .cars import Car
 from .parking import Parking
+from .parking_lots import ParkingLot
 from .payments import Payment
 from .black_list import BlackList
 from .transactions import Transaction
@@ -12,6 +13,7 @@ __all__ = [
     "User",
     "Car",
     "Parking",
+    "ParkingLot",
     "Payment",
     "BlackList",
     "Transaction",
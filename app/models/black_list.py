@@ -7,7 +7,7 @@ from app.models import Base
 class BlackList(Base):
     __tablename__ = "black_list"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False)
+    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False, index=True)
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
 
     car = relationship("Car")
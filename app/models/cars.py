@@ -1,4 +1,6 @@
-from sqlalchemy import String, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.models.base import Base
 
@@ -10,9 +12,16 @@ class Car(Base):
     brand: Mapped[str]
     model: Mapped[str]
     license_plate: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
-    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     rate_id: Mapped[int] = mapped_column(ForeignKey("rates.id"))
+    # Start time of the active parking session, claimed atomically on entry
+    parked_since: Mapped[datetime] = mapped_column(DateTime, nullable=True)
 
     owner = relationship("User", back_populates="cars")
     parkings = relationship("Parking", back_populates="car")
     rate = relationship("Rate", back_populates="cars", lazy="joined")
+
+    # Only parked cars are indexed, for the stale session sweeper
+    __table_args__ = (
+        Index("ix_cars_parked_since", parked_since, postgresql_where=parked_since.is_not(None)),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey
+from sqlalchemy import Boolean, DateTime, Float, ForeignKey, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.models.base import Base
@@ -6,16 +6,26 @@ from app.models.base import Base
 
 class Parking(Base):
     __tablename__ = "parkings"
+    # Partitioned by month; one active session per car is enforced by `cars.parked_since`
+    __table_args__ = {"postgresql_partition_by": "RANGE (start_time)"}
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
+    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False, index=True)
+    lot_id: Mapped[int] = mapped_column(ForeignKey("parking_lots.id"), nullable=True)
     # owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    end_time: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    start_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, primary_key=True, index=True)
+    end_time: Mapped[datetime] = mapped_column(DateTime, nullable=True, index=True)
+    # Claimed by the billing of the session, so a session is billed at most once
+    billed: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false(), nullable=False)
     # duration: Mapped[float] = mapped_column(Float, nullable=True)
     # cost: Mapped[float] = mapped_column(Float, nullable=True)
 
     car = relationship("Car", back_populates="parkings", lazy="joined")
+    lot = relationship("ParkingLot", back_populates="parkings")
+
+    @property
+    def license_plate(self) -> str:
+        return self.car.license_plate
     # owner = relationship("User")
     # payment = relationship("Payment", back_populates="parking")
@@ -0,0 +1,18 @@
+from sqlalchemy import CheckConstraint, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.models.base import Base
+
+
+class ParkingLot(Base):
+    __tablename__ = "parking_lots"
+    __table_args__ = (
+        # The counter row is the only source of truth for occupancy on the entry path
+        CheckConstraint("occupied >= 0 AND occupied <= capacity", name="ck_parking_lots_occupied"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    capacity: Mapped[int] = mapped_column(Integer, nullable=False)
+    occupied: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    parkings = relationship("Parking", back_populates="lot")
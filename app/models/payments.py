@@ -12,16 +12,18 @@ class TransactionType(enum.Enum):
 
 class Payment(Base):
     __tablename__ = "payments"
+    # Partitioned by month; `parking_id` cannot reference the partitioned parkings table
+    __table_args__ = {"postgresql_partition_by": "RANGE (payment_date)"}
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
+    car_id: Mapped[int] = mapped_column(ForeignKey("cars.id"), nullable=False, index=True)
     # user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
-    parking_id: Mapped[int] = mapped_column(ForeignKey("parkings.id"), nullable=True)
+    parking_id: Mapped[int] = mapped_column(nullable=True, index=True)
     amount: Mapped[float] = mapped_column(Float, nullable=False)
-    payment_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    payment_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, primary_key=True, index=True)
     description: Mapped[str] = mapped_column(String(255), nullable=True)
     # paid_status: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
     # user = relationship("User", back_populates="payment")
     car = relationship("Car")
-    parking = relationship("Parking")
+    parking = relationship("Parking", primaryjoin="foreign(Payment.parking_id) == Parking.id", viewonly=True)
@@ -1,4 +1,5 @@
 from sqlalchemy import Boolean, DateTime, Float, ForeignKey, String
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from app.models.base import Base
@@ -9,6 +10,8 @@ class Rate(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     hourly_rate: Mapped[float] = mapped_column(Float, nullable=False)
+    # Time-of-day bands, daily cap and free minutes; see app.schemas.rates.Tariff
+    tariff: Mapped[dict] = mapped_column(JSONB, nullable=True)
 
     cars = relationship("Car", back_populates="rate")
 
@@ -1,4 +1,7 @@
+from sqlalchemy import Row, select
+
 from app.models.black_list import BlackList
+from app.models.cars import Car
 from app.utils.repositories import SQLAlchemyRepository
 
 
@@ -8,4 +11,23 @@ class BlackListRepository(SQLAlchemyRepository):
     Inherits from:
         SQLAlchemyRepository: Base repository class providing common database operations.
     """
-    model = BlackList
\ No newline at end of file
+    model = BlackList
+
+    async def find_page_with_plates(
+            self, after_id: int | None = None, limit: int | None = None
+    ) -> tuple[list[Row], int | None]:
+        """Finds one page of blacklist records together with the license plates of their cars.
+
+        Args:
+            after_id (int | None, optional): Only records with a greater ID are returned. Defaults to None.
+            limit (int | None, optional): The page size. Defaults to None (no limit).
+
+        Returns:
+            tuple[list[Row], int | None]: Rows with `id`, `car_id`, `license_plate` and `reason`,
+            and the ID to continue after, if any.
+        """
+        stmt = (
+            select(self.model.id, self.model.car_id, Car.license_plate, self.model.reason)
+            .join(Car, Car.id == self.model.car_id)
+        )
+        return await self.fetch_page(stmt, after_id, limit, rows=True)
@@ -1,4 +1,6 @@
-from sqlalchemy import select
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, cast, column, select, update, values
 from app.utils.repositories import SQLAlchemyRepository
 from app.models.cars import Car
 
@@ -23,3 +25,21 @@ class CarsRepository(SQLAlchemyRepository):
         stmt = select(self.model).where(self.model.owner_id == owner_id)
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+    async def set_parked_since(self, parked_since: dict[int, datetime | None]) -> None:
+        """Sets the active-session claims of several cars in one statement.
+
+        Args:
+            parked_since (dict[int, datetime | None]): The start time of the active parking of every car,
+                or None for cars that are no longer parked.
+        """
+        claims = values(
+            column("id", Integer), column("parked_since", DateTime), name="claims"
+        ).data(list(parked_since.items()))
+        stmt = (
+            update(self.model)
+            .where(self.model.id == claims.c.id)
+            # An all-NULL column of VALUES would be typed as text
+            .values(parked_since=cast(claims.c.parked_since, DateTime))
+        )
+        await self.session.execute(stmt)
@@ -0,0 +1,105 @@
+from sqlalchemy import Integer, column, func, select, update, values
+
+from app.models.parking_lots import ParkingLot
+from app.utils.repositories import SQLAlchemyRepository
+
+
+class ParkingLotRepository(SQLAlchemyRepository):
+    """Repository class for managing ParkingLot objects in the database.
+
+    Inherits from:
+        SQLAlchemyRepository: Base repository class providing common database operations.
+    """
+    model = ParkingLot
+
+    async def occupy(self, lot_id: int) -> int | None:
+        """Atomically takes one place in a parking lot if it is not full.
+
+        The check and the increment are a single conditional update of the lot counter row,
+        so concurrent entries can never exceed the capacity.
+
+        Args:
+            lot_id (int): The ID of the parking lot.
+
+        Returns:
+            int | None: The new number of occupied places, or None if the lot is full or does not exist.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == lot_id, self.model.occupied < self.model.capacity)
+            .values(occupied=self.model.occupied + 1)
+            .returning(self.model.occupied)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def resize(self, lot_id: int, data: dict) -> ParkingLot | None:
+        """Atomically updates a parking lot unless its new capacity is below the occupied places.
+
+        The check and the update are a single conditional update, so a concurrent entry cannot
+        push the occupancy over the new capacity.
+
+        Args:
+            lot_id (int): The ID of the parking lot.
+            data (dict): The new name and capacity of the parking lot.
+
+        Returns:
+            ParkingLot | None: The updated parking lot, or None if the lot does not exist or the
+            capacity is too low.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == lot_id, self.model.occupied <= data["capacity"])
+            .values(**data)
+            .returning(self.model)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def release(self, lot_id: int) -> int | None:
+        """Atomically frees one place in a parking lot.
+
+        Args:
+            lot_id (int): The ID of the parking lot.
+
+        Returns:
+            int | None: The new number of occupied places, or None if the lot is empty or does not exist.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == lot_id, self.model.occupied > 0)
+            .values(occupied=self.model.occupied - 1)
+            .returning(self.model.occupied)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def find_existing_ids(self, lot_ids: set[int]) -> set[int]:
+        """Finds which of the given parking lot IDs exist.
+
+        Args:
+            lot_ids (set[int]): The IDs of the parking lots.
+
+        Returns:
+            set[int]: The IDs of the parking lots that exist.
+        """
+        stmt = select(self.model.id).where(self.model.id.in_(lot_ids))
+        result = await self.session.execute(stmt)
+        return set(result.scalars().all())
+
+    async def adjust_occupied(self, deltas: dict[int, int]) -> None:
+        """Adds a number of places to the occupancy of several parking lots in one statement.
+
+        The counters are kept between zero and the capacity, because replayed events record cars
+        that have already passed the gate and cannot be refused.
+
+        Args:
+            deltas (dict[int, int]): The number of places taken (positive) or freed (negative) for every lot ID.
+        """
+        changes = values(column("id", Integer), column("delta", Integer), name="changes").data(list(deltas.items()))
+        stmt = (
+            update(self.model)
+            .where(self.model.id == changes.c.id)
+            .values(occupied=func.least(self.model.capacity, func.greatest(0, self.model.occupied + changes.c.delta)))
+        )
+        await self.session.execute(stmt)
@@ -1,49 +1,93 @@
-from sqlalchemy import select
+from typing import AsyncIterator
+
+from sqlalchemy import DateTime, Integer, Row, cast, column, exists, func, insert, literal, select, true, tuple_, update, values
+from sqlalchemy.orm import raiseload
+from app.core.config import settings
+from app.repositories.summaries import CarSummaryMixin
 from app.utils.repositories import SQLAlchemyRepository
+from app.models.black_list import BlackList
+from app.models.cars import Car
 from app.models.parking import Parking
+from app.models.rate import Rate
+from app.schemas.reports import SummaryGrouping
 from datetime import datetime
 
 
-class ParkingRepository(SQLAlchemyRepository):
+class ParkingRepository(CarSummaryMixin, SQLAlchemyRepository):
     """Repository class for managing Parking objects in the database.
 
     Inherits from:
+        CarSummaryMixin: SQL-side summaries by period, rate or car.
         SQLAlchemyRepository: Base repository class providing common database operations.
     """
     model = Parking
 
-    async def find_all_parkings(self, active_only: bool = False) -> list[Parking]:
-        """Finds all parkings, optionally filtering by active status.
+    async def find_all_parkings(
+            self, active_only: bool = False, after_id: int | None = None, limit: int | None = None
+    ) -> tuple[list[Parking], int | None]:
+        """Finds one page of parkings ordered by ID, optionally filtering by active status.
 
         Args:
             active_only (bool, optional): Whether to filter by active parkings. Defaults to False.
+            after_id (int | None, optional): Only parkings with a greater ID are returned. Defaults to None.
+            limit (int | None, optional): The page size. Defaults to None (no limit).
 
         Returns:
-            list[Parking]: A list of Parking objects.
+            tuple[list[Parking], int | None]: The Parking objects and the ID to continue after, if any.
         """
         stmt = select(self.model)
         if active_only:
             stmt = stmt.where(self.model.is_active == True)
 
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return await self.fetch_page(stmt, after_id, limit)
 
-    async def find_by_period(self, start_date: datetime, active_only: bool = False) -> list[Parking]:
-        """Finds all parkings within a specific period, optionally filtering by active status.
+    async def summarize_usage(
+            self, group_by: SummaryGrouping, date_from: datetime | None = None, date_to: datetime | None = None
+    ) -> list[Row]:
+        """Totals the hours of closed parkings in SQL by day, week or month of the start, by rate or by car.
+
+        Args:
+            group_by (SummaryGrouping): What to group the parkings by.
+            date_from (datetime | None, optional): Only parkings started at or after this time. Defaults to None.
+            date_to (datetime | None, optional): Only parkings started before this time. Defaults to None.
+
+        Returns:
+            list[Row]: Rows with the grouping key, `sessions`, `total_hours` and `average_hours`.
+        """
+        hours = func.extract("epoch", self.model.end_time - self.model.start_time) / 3600
+        return await self.summarize(
+            group_by,
+            self.model.start_time,
+            [
+                func.count().label("sessions"),
+                func.sum(hours).label("total_hours"),
+                func.avg(hours).label("average_hours"),
+            ],
+            date_from,
+            date_to,
+            self.model.end_time.is_not(None),
+        )
+
+    async def find_by_period(
+            self, start_date: datetime, active_only: bool = False, after_id: int | None = None, limit: int | None = None
+    ) -> tuple[list[Parking], int | None]:
+        """Finds one page of parkings started within a specific period, optionally filtering by active status.
 
         Args:
             start_date (datetime): The start date of the period.
             active_only (bool, optional): Whether to filter by active parkings. Defaults to False.
+            after_id (int | None, optional): Only parkings with a greater ID are returned. Defaults to None.
+            limit (int | None, optional): The page size. Defaults to None (no limit).
 
         Returns:
-            list[Parking]: A list of Parking objects.
+            tuple[list[Parking], int | None]: The Parking objects and the ID to continue after, if any.
         """
-        stmt = select(self.model).where(self.model.end_time >= start_date)
+        # Filtering on the partition key prunes the scan to the partitions of the period
+        stmt = select(self.model).where(self.model.start_time >= start_date)
         if active_only:
             stmt = stmt.where(self.model.is_active == True)
 
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return await self.fetch_page(stmt, after_id, limit)
 
     async def find_by_car_id(self, car_id: int) -> list[Parking]:
         """Finds all parkings associated with a specific car ID.
@@ -58,26 +102,397 @@ class ParkingRepository(SQLAlchemyRepository):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
-class ParkingRepository(SQLAlchemyRepository):
-    model = Parking
+    async def lock_by_id(self, parking_id: int) -> Parking | None:
+        """Finds a parking by its ID and locks its row until the end of the transaction.
 
-    async def find_all_parkings(self, active_only: bool = False) -> list[Parking]:
-        stmt = select(self.model)
-        if active_only:
-            stmt = stmt.where(self.model.is_active == True)
+        Args:
+            parking_id (int): The ID of the parking.
 
+        Returns:
+            Parking | None: The Parking object, or None if it is not found.
+        """
+        stmt = select(self.model).where(self.model.id == parking_id).with_for_update(of=self.model)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.scalar_one_or_none()
 
-    async def find_by_period(self, start_date: datetime, active_only: bool = False) -> list[Parking]:
-        stmt = select(self.model).where(self.model.end_time >= start_date)
-        if active_only:
-            stmt = stmt.where(self.model.is_active == True)
+    async def claim_billing(self, parkings: list) -> set[int]:
+        """Atomically marks closed parkings as billed unless they already are.
+
+        The check and the flag are a single conditional update, so when two transactions bill the
+        same session, the second one waits for the first and then claims nothing.
+
+        Args:
+            parkings (list): The closed parkings, with `id` and `start_time`.
 
+        Returns:
+            set[int]: The IDs of the parkings claimed by this transaction.
+        """
+        stmt = (
+            update(self.model)
+            .where(
+                tuple_(self.model.id, self.model.start_time).in_(
+                    [(parking.id, parking.start_time) for parking in parkings]
+                ),
+                self.model.end_time.is_not(None),
+                ~self.model.billed,
+            )
+            .values(billed=True)
+            .returning(self.model.id)
+        )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return set(result.scalars().all())
 
-    async def find_by_car_id(self, car_id: int) -> list[Parking]:
-        stmt = select(self.model).where(self.model.car_id == car_id)
+    async def find_by_owner_id(self, owner_id: int) -> list[Row]:
+        """Finds all parkings of all cars of an owner in a single query.
+
+        Cars without parkings are included with an empty parking, so every car of the owner is listed.
+
+        Args:
+            owner_id (int): The ID of the owner.
+
+        Returns:
+            list[Row]: Rows with `license_plate` and `Parking` (None for cars without parkings),
+            ordered by car and parking ID.
+        """
+        stmt = (
+            select(Car.license_plate, self.model)
+            .select_from(Car)
+            .outerjoin(self.model, self.model.car_id == Car.id)
+            .where(Car.owner_id == owner_id)
+            .order_by(Car.id, self.model.id)
+            .options(raiseload(self.model.car))
+        )
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return result.all()
+
+    async def stream_active_sessions(self) -> AsyncIterator[Row]:
+        """Streams all active parkings together with the license plates of their cars.
+
+        Yields:
+            Row: A row with `id`, `car_id`, `license_plate`, `lot_id` and `start_time` of an active parking.
+        """
+        stmt = (
+            select(self.model.id, self.model.car_id, Car.license_plate, self.model.lot_id, self.model.start_time)
+            .join(Car, Car.id == self.model.car_id)
+            .where(self.model.is_active == True)
+        )
+        async for row in self.stream_rows(stmt):
+            yield row
+
+    async def stream_for_export(
+            self,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            license_plate: str | None = None,
+    ) -> AsyncIterator[Row]:
+        """Streams parkings as plain rows for export, in ID order.
+
+        Args:
+            date_from (datetime | None, optional): Only parkings started at or after this time. Defaults to None.
+            date_to (datetime | None, optional): Only parkings started before this time. Defaults to None.
+            license_plate (str | None, optional): Only parkings of the car with this plate. Defaults to None.
+
+        Yields:
+            Row: A row with the exported columns of a parking.
+        """
+        stmt = (
+            select(
+                self.model.id,
+                self.model.car_id,
+                Car.license_plate,
+                self.model.lot_id,
+                self.model.is_active,
+                self.model.start_time,
+                self.model.end_time,
+            )
+            .join(Car, Car.id == self.model.car_id)
+            .order_by(self.model.id)
+        )
+        if date_from is not None:
+            stmt = stmt.where(self.model.start_time >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(self.model.start_time < date_to)
+        if license_plate is not None:
+            stmt = stmt.where(Car.license_plate == license_plate)
+        async for row in self.stream_rows(stmt):
+            yield row
+
+    async def stream_billable_hours(
+            self, date_from: datetime, date_to: datetime, fetch_size: int = settings.TARIFF_SIMULATION_FETCH_SIZE
+    ) -> AsyncIterator[list[Row]]:
+        """Streams the billable hours, rate and owner of the closed parkings started within a period.
+
+        The hours are rounded up per started hour in the database, as `PaymentsService.calculate_amount` does,
+        and the rows are yielded in chunks of `fetch_size`, ready to be loaded into arrays.
+
+        Args:
+            date_from (datetime): Only parkings started at or after this time.
+            date_to (datetime): Only parkings started before this time.
+            fetch_size (int, optional): The number of rows per chunk.
+
+        Yields:
+            list[Row]: Rows with `hours`, `rate_id` and `owner_id` of closed parkings.
+        """
+        hours = cast(func.ceil(func.extract("epoch", self.model.end_time - self.model.start_time) / 3600), Integer)
+        stmt = (
+            select(hours.label("hours"), Car.rate_id, Car.owner_id)
+            .join(Car, Car.id == self.model.car_id)
+            .where(
+                self.model.start_time >= date_from,
+                self.model.start_time < date_to,
+                self.model.end_time.is_not(None),
+            )
+        )
+        result = await self.session.stream(stmt.execution_options(yield_per=fetch_size))
+        async for rows in result.partitions():
+            yield rows
+
+    async def find_entry_state(self, license_plate: str) -> Row | None:
+        """Resolves everything needed to start a parking session in a single query.
+
+        Args:
+            license_plate (str): The license plate of the car.
+
+        Returns:
+            Row | None: A row with `car_id` and `is_blacklisted`, or None if the car is not found.
+        """
+        stmt = select(
+            Car.id.label("car_id"),
+            exists().where(BlackList.car_id == Car.id).label("is_blacklisted"),
+        ).where(Car.license_plate == license_plate)
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def add_active(self, car_id: int, start_time: datetime, lot_id: int | None = None) -> int | None:
+        """Inserts an active parking unless the car already has one.
+
+        The car is claimed by setting `cars.parked_since` only while it is empty, and the parking is
+        inserted from the claim in the same statement. Concurrent starts for the same car serialise
+        on the car row, so only one of them can succeed.
+
+        Args:
+            car_id (int): The ID of the car.
+            start_time (datetime): The start time of the parking.
+            lot_id (int | None, optional): The ID of the parking lot. Defaults to None.
+
+        Returns:
+            int | None: The ID of the new parking, or None if the car is already parked.
+        """
+        claim = (
+            update(Car)
+            .where(Car.id == car_id, Car.parked_since.is_(None))
+            .values(parked_since=start_time)
+            .returning(Car.id)
+            .cte("claim")
+        )
+        stmt = (
+            insert(self.model)
+            .from_select(
+                ["car_id", "lot_id", "start_time", "is_active"],
+                select(
+                    claim.c.id,
+                    literal(lot_id, self.model.lot_id.type),
+                    literal(start_time, self.model.start_time.type),
+                    true(),
+                ),
+            )
+            .returning(self.model.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def lock_states_by_plates(self, license_plates: list[str]) -> list[Row]:
+        """Resolves and locks the cars with the given license plates in a single query.
+
+        The car rows are locked until the end of the transaction, so no gate event can start or
+        close a session of these cars concurrently.
+
+        Args:
+            license_plates (list[str]): The license plates of the cars.
+
+        Returns:
+            list[Row]: Rows with `car_id`, `license_plate`, `owner_id`, `hourly_rate`, `tariff`,
+            `parked_since` and `is_blacklisted` of the cars that were found.
+        """
+        stmt = (
+            select(
+                Car.id.label("car_id"),
+                Car.license_plate,
+                Car.owner_id,
+                Rate.hourly_rate,
+                Rate.tariff,
+                Car.parked_since,
+                exists().where(BlackList.car_id == Car.id).label("is_blacklisted"),
+            )
+            .join(Rate, Rate.id == Car.rate_id)
+            .where(Car.license_plate.in_(license_plates))
+            .with_for_update(of=Car)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def add_many(self, parkings: list[dict]) -> list[int]:
+        """Inserts several parkings in one batched statement.
+
+        Args:
+            parkings (list[dict]): The `car_id`, `lot_id`, `start_time`, `end_time` and `is_active` of every parking.
+
+        Returns:
+            list[int]: The IDs of the new parkings, in the given order.
+        """
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, parkings)
+        return list(result.scalars().all())
+
+    async def close_many(self, closings: list[tuple[int, datetime, datetime]]) -> list[Row]:
+        """Closes several active parkings in one statement.
+
+        The callers must hold the car rows locked and release their claims in `cars.parked_since`.
+
+        Args:
+            closings (list[tuple[int, datetime, datetime]]): The car ID, start time and end time of every
+                parking to close; the start time selects the partition of the parking.
+
+        Returns:
+            list[Row]: Rows with `id`, `car_id`, `lot_id`, `start_time` and `end_time` of the closed parkings.
+        """
+        closing = values(
+            column("car_id", Integer), column("start_time", DateTime), column("end_time", DateTime), name="closing"
+        ).data(closings)
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.car_id == closing.c.car_id,
+                self.model.start_time == closing.c.start_time,
+                self.model.is_active == True,
+            )
+            .values(is_active=False, end_time=closing.c.end_time)
+            .returning(
+                self.model.id, self.model.car_id, self.model.lot_id, self.model.start_time, self.model.end_time
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def close_stale(self, started_before: datetime, end_time: datetime, limit: int) -> list[Row]:
+        """Closes a batch of active parkings started before a given time, in a single statement.
+
+        The claims of the oldest parked cars are released first, locking the car rows in the same
+        order as a gate exit does; cars locked by a concurrent gate event or sweeper are skipped.
+
+        Args:
+            started_before (datetime): Only parkings started before this time are closed.
+            end_time (datetime): The end time of the closed parkings.
+            limit (int): The maximum number of parkings to close.
+
+        Returns:
+            list[Row]: Rows with `id`, `car_id`, `lot_id`, `start_time`, `end_time`, `owner_id`,
+            `hourly_rate` and `tariff` of the closed parkings.
+        """
+        stale = (
+            select(Car.id, Car.parked_since)
+            .where(Car.parked_since < started_before)
+            .order_by(Car.parked_since)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("stale")
+        )
+        released = (
+            update(Car)
+            .where(Car.id == stale.c.id, Rate.id == Car.rate_id)
+            .values(parked_since=None)
+            .returning(
+                Car.id.label("car_id"),
+                stale.c.parked_since.label("start_time"),
+                Car.owner_id,
+                Rate.hourly_rate,
+                Rate.tariff,
+            )
+            .cte("released")
+        )
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.car_id == released.c.car_id,
+                self.model.start_time == released.c.start_time,
+                self.model.is_active == True,
+            )
+            .values(is_active=False, end_time=end_time)
+            .returning(
+                self.model.id,
+                self.model.car_id,
+                self.model.lot_id,
+                self.model.start_time,
+                self.model.end_time,
+                released.c.owner_id,
+                released.c.hourly_rate,
+                released.c.tariff,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def find_exit_state(self, license_plate: str) -> Row | None:
+        """Resolves the car, its owner, its rate and blacklist status in a single query.
+
+        Args:
+            license_plate (str): The license plate of the car.
+
+        Returns:
+            Row | None: A row with `car_id`, `owner_id`, `hourly_rate`, `tariff` and `is_blacklisted`,
+            or None if the car is not found.
+        """
+        stmt = (
+            select(
+                Car.id.label("car_id"),
+                Car.owner_id,
+                Rate.hourly_rate,
+                Rate.tariff,
+                exists().where(BlackList.car_id == Car.id).label("is_blacklisted"),
+            )
+            .join(Rate, Rate.id == Car.rate_id)
+            .where(Car.license_plate == license_plate)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def close_active(self, car_id: int, end_time: datetime) -> Row | None:
+        """Atomically closes the active parking of a car.
+
+        The claim in `cars.parked_since` is released first, which locks the car row, so only one
+        concurrent caller can close a given session; the others get None. The released start time
+        selects the single partition that holds the session.
+
+        Args:
+            car_id (int): The ID of the car.
+            end_time (datetime): The end time of the parking.
+
+        Returns:
+            Row | None: A row with `id`, `car_id`, `lot_id`, `start_time` and `end_time` of the closed
+            parking, or None if the car has no active parking.
+        """
+        claimed = select(Car.id, Car.parked_since).where(Car.id == car_id).with_for_update().subquery("claimed")
+        release = (
+            update(Car)
+            .where(Car.id == claimed.c.id, claimed.c.parked_since.is_not(None))
+            .values(parked_since=None)
+            .returning(claimed.c.parked_since)
+        )
+        start_time = (await self.session.execute(release)).scalar_one_or_none()
+        if start_time is None:
+            return None
+
+        stmt = (
+            update(self.model)
+            .where(
+                self.model.car_id == car_id,
+                self.model.start_time == start_time,
+                self.model.is_active == True,
+            )
+            .values(is_active=False, end_time=end_time)
+            .returning(
+                self.model.id, self.model.car_id, self.model.lot_id, self.model.start_time, self.model.end_time
+            )
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
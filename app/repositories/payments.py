@@ -1,21 +1,22 @@
-from typing import Sequence
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, func, insert, select
 from sqlalchemy.orm import joinedload
+from app.repositories.summaries import CarSummaryMixin
 from app.utils.repositories import SQLAlchemyRepository
 from app.models.payments import Payment
 from app.models.parking import Parking
 from app.models.cars import Car
-from pathlib import Path
+from app.schemas.reports import SummaryGrouping
 
 from datetime import datetime
-import csv
 
 
-class PaymentRepository(SQLAlchemyRepository):
+class PaymentRepository(CarSummaryMixin, SQLAlchemyRepository):
     """Repository class for managing Payment objects in the database.
 
     Inherits from:
+        CarSummaryMixin: SQL-side summaries by period, rate or car.
         SQLAlchemyRepository: Base repository class providing common database operations.
     """
     model = Payment
@@ -46,6 +47,28 @@ class PaymentRepository(SQLAlchemyRepository):
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
+    async def find_by_owner_id(self, owner_id: int) -> list[Row]:
+        """Finds all payments for all cars of an owner in a single query.
+
+        Cars without payments are included with an empty payment, so every car of the owner is listed.
+
+        Args:
+            owner_id (int): The ID of the owner.
+
+        Returns:
+            list[Row]: Rows with `license_plate` and `Payment` (None for cars without payments),
+            ordered by car and payment ID.
+        """
+        stmt = (
+            select(Car.license_plate, self.model)
+            .select_from(Car)
+            .outerjoin(self.model, self.model.car_id == Car.id)
+            .where(Car.owner_id == owner_id)
+            .order_by(Car.id, self.model.id)
+        )
+        result = await self.session.execute(stmt)
+        return result.all()
+
     async def find_by_parking_id(self, parking_id: int) -> Sequence[Payment]:
         """Finds all payments associated with a specific parking ID.
 
@@ -74,7 +97,7 @@ class PaymentRepository(SQLAlchemyRepository):
     
 
     async def find_by_license_plate(self, license_plate: str) -> list[Payment]:
-        """Finds all payments associated with a specific license plate and exports them to a CSV file.
+        """Finds all payments associated with a specific license plate.
 
         Args:
             license_plate (str): The license plate of the car.
@@ -88,47 +111,87 @@ class PaymentRepository(SQLAlchemyRepository):
             .where(Car.license_plate == license_plate)
         )
         result = await self.session.execute(stmt)
-        payments = result.scalars().all()
-
-        # Prepare data for CSV
-        csv_data = []
-        for payment in payments:
-            csv_data.append({
-                'payment_id': payment.id,
-                'car_id': payment.car_id,
-                'parking_id': payment.parking_id,
-                'amount': payment.amount,
-                'payment_date': payment.payment_date.isoformat(),
-                'description': payment.description,
-            })
-        output_directory = Path("./csv")
-        output_directory.mkdir(parents=True, exist_ok=True)
-        # Write to CSV file
-        filename = f"{license_plate}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        file_path = output_directory / filename
-        with open(file_path, 'w', newline='') as csvfile:
-            fieldnames = csv_data[0].keys() if csv_data else []
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for row in csv_data:
-                writer.writerow(row)
-              
-        return payments
+        return result.scalars().all()
+
+    async def stream_for_export(
+            self,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            license_plate: str | None = None,
+    ) -> AsyncIterator[Row]:
+        """Streams payments as plain rows for export, in ID order.
+
+        Args:
+            date_from (datetime | None, optional): Only payments made at or after this time. Defaults to None.
+            date_to (datetime | None, optional): Only payments made before this time. Defaults to None.
+            license_plate (str | None, optional): Only payments of the car with this plate. Defaults to None.
+
+        Yields:
+            Row: A row with the exported columns of a payment.
+        """
+        stmt = (
+            select(
+                self.model.id,
+                self.model.car_id,
+                Car.license_plate,
+                self.model.parking_id,
+                self.model.amount,
+                self.model.payment_date,
+                self.model.description,
+            )
+            .join(Car, Car.id == self.model.car_id)
+            .order_by(self.model.id)
+        )
+        if date_from is not None:
+            stmt = stmt.where(self.model.payment_date >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(self.model.payment_date < date_to)
+        if license_plate is not None:
+            stmt = stmt.where(Car.license_plate == license_plate)
+        async for row in self.stream_rows(stmt):
+            yield row
     
 
-    async def find_by_period(self, start_date: datetime):
-        """Finds all payments made after a specific start date.
+    async def summarize_revenue(
+            self, group_by: SummaryGrouping, date_from: datetime | None = None, date_to: datetime | None = None
+    ) -> list[Row]:
+        """Totals payments in SQL by day, week or month of the payment date, by rate or by car.
+
+        Args:
+            group_by (SummaryGrouping): What to group the payments by.
+            date_from (datetime | None, optional): Only payments made at or after this time. Defaults to None.
+            date_to (datetime | None, optional): Only payments made before this time. Defaults to None.
+
+        Returns:
+            list[Row]: Rows with the grouping key, `payments`, `total_amount` and `average_amount`.
+        """
+        return await self.summarize(
+            group_by,
+            self.model.payment_date,
+            [
+                func.count().label("payments"),
+                func.sum(self.model.amount).label("total_amount"),
+                func.avg(self.model.amount).label("average_amount"),
+            ],
+            date_from,
+            date_to,
+        )
+
+    async def find_by_period(
+            self, start_date: datetime, after_id: int | None = None, limit: int | None = None
+    ) -> tuple[list[Payment], int | None]:
+        """Finds one page of payments made after a specific start date, ordered by ID.
 
         Args:
             start_date (datetime): The start date.
+            after_id (int | None, optional): Only payments with a greater ID are returned. Defaults to None.
+            limit (int | None, optional): The page size. Defaults to None (no limit).
 
         Returns:
-            list[Payment]: A list of Payment objects.
+            tuple[list[Payment], int | None]: The Payment objects and the ID to continue after, if any.
         """
         stmt = select(self.model).where(self.model.payment_date >= start_date)
-        res = await self.session.execute(stmt)
-        return res.scalars().all()
+        return await self.fetch_page(stmt, after_id, limit)
     
 
     async def add_one(self, payment_dict: dict) -> Payment:
@@ -145,3 +208,15 @@ class PaymentRepository(SQLAlchemyRepository):
         await self.session.commit()
         return new_payment
 
+    async def add_many(self, payment_dicts: list[dict]) -> list[int]:
+        """Adds several payments in one batched statement.
+
+        Args:
+            payment_dicts (list[dict]): The details of every payment.
+
+        Returns:
+            list[int]: The IDs of the new payments, in the given order.
+        """
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, payment_dicts)
+        return list(result.scalars().all())
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Row, func, literal_column, select
+
+from app.models.cars import Car
+from app.schemas.reports import SummaryGrouping
+
+
+class CarSummaryMixin:
+    """Adds SQL-side summaries to repositories of models that belong to a car.
+
+    The model must have a `car_id` column; rates are resolved through the car.
+    """
+
+    async def summarize(
+        self,
+        group_by: SummaryGrouping,
+        time_column: ColumnElement,
+        aggregates: list[ColumnElement],
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        *criteria: ColumnElement,
+    ) -> list[Row]:
+        """Aggregates the rows of the model in SQL, one result row per day, week, month, rate or car.
+
+        Days, weeks and months are truncated from `time_column`, which also bounds the summary to
+        [`date_from`, `date_to`). A row is grouped under the current rate of its car. The key of the
+        grouping is labelled `period_start`, `rate_id` or `car_id`, and results are ordered by it.
+        """
+        if group_by == SummaryGrouping.RATE:
+            key = Car.rate_id.label("rate_id")
+        elif group_by == SummaryGrouping.CAR:
+            key = self.model.car_id.label("car_id")
+        else:
+            # The field is inlined, as a bound parameter would make SELECT and GROUP BY differ
+            key = func.date_trunc(literal_column(f"'{group_by.value}'"), time_column).label("period_start")
+        stmt = select(key, *aggregates).select_from(self.model).where(*criteria).group_by(key).order_by(key)
+        if group_by == SummaryGrouping.RATE:
+            stmt = stmt.join(Car, Car.id == self.model.car_id)
+        if date_from is not None:
+            stmt = stmt.where(time_column >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(time_column < date_to)
+        result = await self.session.execute(stmt)
+        return list(result.all())
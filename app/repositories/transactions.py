@@ -1,6 +1,7 @@
-from typing import Sequence
+from datetime import datetime
+from typing import AsyncIterator
 
-from sqlalchemy import select
+from sqlalchemy import Row, select
 
 from app.models.transactions import Transaction
 from app.utils.repositories import SQLAlchemyRepository
@@ -14,18 +15,46 @@ class TransactionRepository(SQLAlchemyRepository):
     """
     model = Transaction
 
-    async def find_by_user_id(self, user_id: int) -> Sequence[Transaction]:
-        """Finds all transactions associated with a specific user ID.
+    async def find_by_user_id(
+            self, user_id: int, after_id: int | None = None, limit: int | None = None
+    ) -> tuple[list[Transaction], int | None]:
+        """Finds one page of transactions associated with a specific user ID, ordered by ID.
 
         Args:
             user_id (int): The ID of the user.
+            after_id (int | None, optional): Only transactions with a greater ID are returned. Defaults to None.
+            limit (int | None, optional): The page size. Defaults to None (no limit).
 
         Returns:
-            Sequence[Transaction]: A sequence of Transaction objects.
+            tuple[list[Transaction], int | None]: The Transaction objects and the ID to continue after, if any.
         """
         stmt = select(self.model).where(self.model.user_id == user_id)
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return await self.fetch_page(stmt, after_id, limit)
 
-    
+    async def stream_for_export(
+            self,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            user_id: int | None = None,
+    ) -> AsyncIterator[Row]:
+        """Streams transactions as plain rows for export, in ID order.
 
+        Args:
+            date_from (datetime | None, optional): Only transactions created at or after this time. Defaults to None.
+            date_to (datetime | None, optional): Only transactions created before this time. Defaults to None.
+            user_id (int | None, optional): Only transactions of this user. Defaults to None.
+
+        Yields:
+            Row: A row with the exported columns of a transaction.
+        """
+        stmt = select(
+            self.model.id, self.model.user_id, self.model.amount, self.model.created_at
+        ).order_by(self.model.id)
+        if date_from is not None:
+            stmt = stmt.where(self.model.created_at >= date_from)
+        if date_to is not None:
+            stmt = stmt.where(self.model.created_at < date_to)
+        if user_id is not None:
+            stmt = stmt.where(self.model.user_id == user_id)
+        async for row in self.stream_rows(stmt):
+            yield row
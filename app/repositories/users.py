@@ -1,3 +1,5 @@
+from sqlalchemy import Float, Integer, column, update, values
+
 from app.models.users import User
 from app.utils.repositories import SQLAlchemyRepository
 
@@ -9,3 +11,40 @@ class UsersRepository(SQLAlchemyRepository):
         SQLAlchemyRepository: Base repository class providing common database operations.
     """
     model = User
+
+    async def change_balance(self, user_id: int, delta: float, min_balance: float | None = None) -> float | None:
+        """Atomically adds `delta` to a user's balance in the database.
+
+        Args:
+            user_id (int): The ID of the user.
+            delta (float): The amount to add; negative to debit.
+            min_balance (float | None, optional): If set, the change is applied only while the current
+                balance is above this value. Defaults to None.
+
+        Returns:
+            float | None: The new balance, or None if the user is not found or the balance is not above `min_balance`.
+        """
+        stmt = (
+            update(self.model)
+            .where(self.model.id == user_id)
+            .values(balance=self.model.balance + delta)
+            .returning(self.model.balance)
+        )
+        if min_balance is not None:
+            stmt = stmt.where(self.model.balance > min_balance)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def change_balances(self, deltas: dict[int, float]) -> None:
+        """Atomically adds an amount to the balances of several users in one statement.
+
+        Args:
+            deltas (dict[int, float]): The amount to add for every user ID; negative to debit.
+        """
+        changes = values(column("id", Integer), column("delta", Float), name="changes").data(list(deltas.items()))
+        stmt = (
+            update(self.model)
+            .where(self.model.id == changes.c.id)
+            .values(balance=self.model.balance + changes.c.delta)
+        )
+        await self.session.execute(stmt)
@@ -9,6 +9,9 @@ from app.routers.payments import router as router_payment
 from app.routers.rates import router as router_rate
 from app.routers.transactions import router as router_transactions
 from app.routers.black_list import router as router_black_list
+from app.routers.cameras import router as router_cameras
+from app.routers.parking_lots import router as router_parking_lots
+from app.routers.exports import router as router_exports
 
 all_routers = [
     router_auth,
@@ -21,4 +24,7 @@ all_routers = [
     router_rate,
     router_transactions,
     router_black_list,
+    router_cameras,
+    router_parking_lots,
+    router_exports,
 ]
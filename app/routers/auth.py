@@ -4,6 +4,7 @@ from app.schemas.auth import TokenResponse, UserSchemaLogin
 from app.schemas.users import UserSchema, UserSchemaAdd
 from app.services.auth import AuthService
 from app.services.users import UsersService
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
 
 router = APIRouter(
@@ -12,7 +13,7 @@ router = APIRouter(
 )
 
 
-@router.post("/signup", response_model=UserSchema)
+@router.post("/signup", response_model=UserSchema, dependencies=[Depends(admission.slot("auth"))])
 async def signup(
     user: UserSchemaAdd,
     uow: UOWDep,
@@ -38,7 +39,7 @@ async def signup(
     return created_user
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(admission.slot("auth"))])
 async def login(
     user: UserSchemaLogin,
     uow: UOWDep,
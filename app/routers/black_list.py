@@ -1,32 +1,37 @@
 from fastapi import APIRouter, Depends, status
 from app.models.users import User
 from app.schemas.black_list import BlackListSchemaAdd, BlackListResponse
+from app.schemas.pagination import Page
 from app.services.black_list import BlackListService
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
 from app.utils.guard import guard
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/black_list", tags=["Black List"])
 
 
-@router.get("/", response_model=list[BlackListResponse])
+@router.get("/", response_model=Page[BlackListResponse], dependencies=[Depends(admission.slot("report"))])
 async def get_black_list(
         uow: UOWDep,
+        page: PageParams = Depends(),
         black_list_service: BlackListService = Depends(),
         current_user: User = Depends(guard.is_admin),
 ):
-    """Retrieve the entire blacklist.
+    """Retrieve the blacklist page by page.
 
-    This endpoint returns a list of all entries in the blacklist. Access is restricted to admin users only.
+    This endpoint returns one page of blacklist entries. Access is restricted to admin users only.
 
     Args:
         uow (UOWDep): Dependency for unit of work management.
+        page (PageParams): The cursor and size of the requested page.
         black_list_service (BlackListService): Service for managing blacklist-related operations.
         current_user (User): The currently authenticated user, required to be an admin.
 
     Returns:
-        list[BlackListResponse]: A list of blacklist entries.
+        Page[BlackListResponse]: A page of blacklist entries and the cursor of the next page.
     """
-    black_list = await black_list_service.get_black_list(uow)
+    black_list = await black_list_service.get_black_list(uow, page)
     return black_list
 
 
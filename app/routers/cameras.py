@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.data_science.camera_profiles import camera_profiles
+from app.models.users import User
+from app.schemas.cameras import CameraProfile, CameraProfileSchemaUpdate
+from app.services.parking_lots import ParkingLotsService
+from app.utils.dependencies import UOWDep
+from app.utils.guard import guard
+
+router = APIRouter(prefix="/cameras", tags=["Cameras"])
+
+
+@router.get("/", response_model=list[CameraProfile])
+async def get_camera_profiles(
+        current_user: User = Depends(guard.is_admin),
+):
+    """Retrieve all registered camera detection profiles.
+
+    Args:
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        list[CameraProfile]: List of camera profiles.
+    """
+    return camera_profiles.all()
+
+
+@router.get("/{camera_id}", response_model=CameraProfile, status_code=status.HTTP_200_OK)
+async def get_camera_profile(
+        camera_id: str,
+        current_user: User = Depends(guard.is_admin),
+):
+    """Retrieve the detection profile used for a camera.
+
+    Cameras without a registered profile use the default full-frame profile.
+
+    Args:
+        camera_id (str): The id of the camera.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        CameraProfile: The detection profile applied to the camera.
+    """
+    return camera_profiles.get(camera_id)
+
+
+@router.put("/{camera_id}", response_model=CameraProfile, status_code=status.HTTP_200_OK)
+async def update_camera_profile(
+        camera_id: str,
+        profile_data: CameraProfileSchemaUpdate,
+        uow: UOWDep,
+        lots_service: ParkingLotsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Register or replace the detection profile for a camera.
+
+    The profile defines the region of interest, the plate size range and the cascade parameters
+    used when detecting plates on images sent by this camera.
+
+    Args:
+        camera_id (str): The id of the camera.
+        profile_data (CameraProfileSchemaUpdate): The detection parameters for the camera.
+        uow (UOWDep): Dependency for the unit of work.
+        lots_service (ParkingLotsService): Service for managing parking lots.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        CameraProfile: The stored camera profile.
+
+    Raises:
+        HTTPException: If the parking lot of the camera does not exist.
+    """
+    if profile_data.lot_id is not None:
+        await lots_service.get_lot_by_id(uow, profile_data.lot_id)
+    return camera_profiles.upsert(CameraProfile(camera_id=camera_id, **profile_data.model_dump()))
+
+
+@router.delete("/{camera_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_camera_profile(
+        camera_id: str,
+        current_user: User = Depends(guard.is_admin),
+):
+    """Remove the detection profile for a camera.
+
+    Args:
+        camera_id (str): The id of the camera.
+        current_user (User): The current user, required to be an admin.
+    """
+    if camera_profiles.delete(camera_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Camera profile not found")
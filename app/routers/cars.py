@@ -3,33 +3,38 @@ from fastapi import APIRouter, Depends, status
 from app.models.users import User
 from app.models.cars import Car
 from app.schemas.cars import CarSchemaAdd, CarSchemaUpdate, CarResponse
+from app.schemas.pagination import Page
 from app.services.cars import CarsService
 from app.services.auth import auth_service
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
 from app.utils.guard import guard
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/cars", tags=["Cars"])
 
 
-@router.get("/", response_model=list[CarResponse])
+@router.get("/", response_model=Page[CarResponse], dependencies=[Depends(admission.slot("report"))])
 async def get_cars(
         uow: UOWDep,
+        page: PageParams = Depends(),
         cars_service: CarsService = Depends(),
         current_user: User = Depends(guard.is_admin),
 ):
-    """Retrieve a list of all cars.
+    """Retrieve cars page by page.
 
-    This endpoint returns a list of all cars from the database. Access is restricted to admin users only.
+    This endpoint returns one page of cars from the database. Access is restricted to admin users only.
 
     Args:
         uow (UOWDep): Dependency for unit of work management.
+        page (PageParams): The cursor and size of the requested page.
         cars_service (CarsService): Service for managing car-related operations.
         current_user (User): The currently authenticated user, required to be an admin.
 
     Returns:
-        list[CarResponse]: A list of car objects with details.
+        Page[CarResponse]: A page of car objects and the cursor of the next page.
     """
-    cars = await cars_service.get_cars(uow)
+    cars = await cars_service.get_cars(uow, page)
     return cars
 
 
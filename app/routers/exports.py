@@ -0,0 +1,123 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.models.users import User
+from app.schemas.exports import ExportFormat
+from app.services.exports import ExportService
+from app.utils.admission import admission
+from app.utils.dependencies import UOWDep
+from app.utils.guard import guard
+
+router = APIRouter(prefix="/exports", tags=["Exports"])
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+async def export_response(content, name: str, export_format: ExportFormat, compress: bool) -> StreamingResponse:
+    filename = f"{name}.{export_format.value}"
+    media_type = MEDIA_TYPES[export_format]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    # The report slot is held until the whole export has been streamed
+    return await admission.stream(
+        "report",
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/parkings")
+async def export_parkings(
+        uow: UOWDep,
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="Export format"),
+        compress: bool = Query(False, alias="gzip", description="Compress the export with gzip"),
+        date_from: datetime | None = Query(None, description="Only parkings started at or after this time"),
+        date_to: datetime | None = Query(None, description="Only parkings started before this time"),
+        license_plate: str | None = Query(None, description="Only parkings of this car"),
+        export_service: ExportService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Export parking sessions as a CSV or NDJSON stream.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        export_format (ExportFormat): The format of the export.
+        compress (bool): Whether to gzip the export.
+        date_from (datetime | None): Only parkings started at or after this time.
+        date_to (datetime | None): Only parkings started before this time.
+        license_plate (str | None): Only parkings of the car with this license plate.
+        export_service (ExportService): Service for exporting data.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        StreamingResponse: The exported parkings as a file download.
+    """
+    content = export_service.export_parkings(uow, export_format, compress, date_from, date_to, license_plate)
+    return await export_response(content, "parkings", export_format, compress)
+
+
+@router.get("/payments")
+async def export_payments(
+        uow: UOWDep,
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="Export format"),
+        compress: bool = Query(False, alias="gzip", description="Compress the export with gzip"),
+        date_from: datetime | None = Query(None, description="Only payments made at or after this time"),
+        date_to: datetime | None = Query(None, description="Only payments made before this time"),
+        license_plate: str | None = Query(None, description="Only payments of this car"),
+        export_service: ExportService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Export payments as a CSV or NDJSON stream.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        export_format (ExportFormat): The format of the export.
+        compress (bool): Whether to gzip the export.
+        date_from (datetime | None): Only payments made at or after this time.
+        date_to (datetime | None): Only payments made before this time.
+        license_plate (str | None): Only payments of the car with this license plate.
+        export_service (ExportService): Service for exporting data.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        StreamingResponse: The exported payments as a file download.
+    """
+    content = export_service.export_payments(uow, export_format, compress, date_from, date_to, license_plate)
+    return await export_response(content, "payments", export_format, compress)
+
+
+@router.get("/transactions")
+async def export_transactions(
+        uow: UOWDep,
+        export_format: ExportFormat = Query(ExportFormat.CSV, alias="format", description="Export format"),
+        compress: bool = Query(False, alias="gzip", description="Compress the export with gzip"),
+        date_from: datetime | None = Query(None, description="Only transactions created at or after this time"),
+        date_to: datetime | None = Query(None, description="Only transactions created before this time"),
+        user_id: int | None = Query(None, description="Only transactions of this user"),
+        export_service: ExportService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Export balance transactions as a CSV or NDJSON stream.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        export_format (ExportFormat): The format of the export.
+        compress (bool): Whether to gzip the export.
+        date_from (datetime | None): Only transactions created at or after this time.
+        date_to (datetime | None): Only transactions created before this time.
+        user_id (int | None): Only transactions of this user.
+        export_service (ExportService): Service for exporting data.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        StreamingResponse: The exported transactions as a file download.
+    """
+    content = export_service.export_transactions(uow, export_format, compress, date_from, date_to, user_id)
+    return await export_response(content, "transactions", export_format, compress)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from app.models.users import User
 from app.schemas.users import UserResponse, UserWithCarsResponse
 from app.schemas.parking import ParkingResponse, ParkingLiteResponse
@@ -44,6 +44,7 @@ async def get_my_parkings(
         uow: UOWDep,
         parking_service: ParkingService = Depends(),
         current_user: User = Depends(auth_service.get_current_user),
+        include_archived: bool = Query(False, description="Include parkings moved to the archive"),
 ):
     """Retrieve all parking sessions associated with the current user.
 
@@ -54,11 +55,12 @@ async def get_my_parkings(
         uow (UOWDep): Dependency for the unit of work.
         parking_service (ParkingService): Service for parking-related operations.
         current_user (User): The currently authenticated user.
+        include_archived (bool): Whether to include parkings moved to the archive.
 
     Returns:
         dict[str, list[ParkingResponse]]: A dictionary containing a list of parking sessions for the user.
     """
-    parkings = await parking_service.get_parkings_by_owner_id(uow, current_user.id)
+    parkings = await parking_service.get_parkings_by_owner_id(uow, current_user.id, include_archived)
     return parkings
 
 
@@ -67,6 +69,7 @@ async def get_my_payments(
         uow: UOWDep,
         payments_service: PaymentsService = Depends(),
         current_user: User = Depends(auth_service.get_current_user),
+        include_archived: bool = Query(False, description="Include payments moved to the archive"),
 ):
     """Retrieve all payments made by the current user.
 
@@ -77,9 +80,10 @@ async def get_my_payments(
         uow (UOWDep): Dependency for the unit of work.
         payments_service (PaymentsService): Service for payment-related operations.
         current_user (User): The currently authenticated user.
+        include_archived (bool): Whether to include payments moved to the archive.
 
     Returns:
         dict[str, list[PaymentResponse]]: A dictionary containing a list of payments made by the user.
     """
-    payments = await payments_service.get_my_payments(uow, current_user.id)
+    payments = await payments_service.get_my_payments(uow, current_user.id, include_archived)
     return payments
@@ -1,23 +1,35 @@
+import logging
+from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, status, Query, UploadFile, HTTPException, File
+from fastapi import APIRouter, Body, Depends, status, Query, UploadFile, HTTPException, File, Form
 
 from app.models import Car
 from app.models.users import User
-from app.schemas.parking import ParkingCreate, ParkingResponse, ParkingPeriod
+from app.core.config import settings
+from app.schemas.parking import ParkingCreate, ParkingResponse, ParkingPeriod, ParkingBatchResult, \
+    OccupancyResponse, ParkingEvent
+from app.schemas.pagination import Page
+from app.schemas.reports import SummaryGrouping, UsageSummary
+from app.services.gate_debounce import gate_debounce
 from app.services.parkings import ParkingService
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
+from app.utils.dispatch import gate_events
 from app.utils.guard import guard
-from app.data_science.detector import detector
+from app.utils.pagination import PageParams
+from app.data_science.camera_profiles import camera_profiles
+from app.data_science.detector import detector, multi_detector
 
 router = APIRouter(prefix="/parking", tags=["Parking"])
 
 
-@router.post("/by_detector", response_model=ParkingResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/by_detector", response_model=ParkingResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admission.slot("gate"))])
 async def start_parking_by_detector(
         uow: UOWDep,
         parking_service: ParkingService = Depends(),
-        file: UploadFile = File(...), 
+        file: UploadFile = File(...),
+        camera_id: str | None = Form(None),
         ):
     """Start a parking session using an image detected license plate.
 
@@ -27,6 +39,8 @@ async def start_parking_by_detector(
         uow (UOWDep): Dependency for the unit of work.
         parking_service (ParkingService): Service for managing parking operations.
         file (UploadFile): The image file to process for license plate detection.
+        camera_id (str | None): The id of the camera that took the image, used to select its detection profile
+            and the parking lot it guards.
 
     Returns:
         ParkingResponse: The details of the parking session that was started.
@@ -34,26 +48,38 @@ async def start_parking_by_detector(
     Raises:
         HTTPException: If there is an error processing the image, a 404 error is raised with a message.
     """
-    try:
-        image = await file.read()
-        license_plate_text = detector(image)
-
-    except Exception as e:
-        print({str(e)})
-        raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
-
-    # guard.positive_balance(current_user, parking_service)
-
-    parking = await parking_service.start_parking(uow, license_plate=license_plate_text.upper())
+    async with gate_events.gate(camera_id):
+        try:
+            image = await file.read()
+            license_plate_text = await detector(image, camera_id)
+
+        except Exception as e:
+            logging.error(f"Error processing image: {e}")
+            raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
+
+        # guard.positive_balance(current_user, parking_service)
+
+        license_plate = license_plate_text.upper()
+        async with gate_events.plates([license_plate]):
+            # Repeated detections of a car idling at the barrier get the original session back
+            parking = await gate_debounce.run(
+                camera_id,
+                "entry",
+                license_plate,
+                lambda: parking_service.start_parking(
+                    uow, license_plate=license_plate, lot_id=camera_profiles.get(camera_id).lot_id
+                ),
+            )
 
     return parking
 
 
-@router.put("/complete_by_detector", response_model=ParkingResponse, status_code=status.HTTP_200_OK)
+@router.put("/complete_by_detector", response_model=ParkingResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("gate"))])
 async def complete_parking_by_detector(
         uow: UOWDep,
         parking_service: ParkingService = Depends(),
-        file: UploadFile = File(...),        
+        file: UploadFile = File(...),
+        camera_id: str | None = Form(None),
         # car: Car = Depends(guard.blacklisted),
 ):
     """Complete a parking session using an image detected license plate.
@@ -64,6 +90,7 @@ async def complete_parking_by_detector(
         uow (UOWDep): Dependency for the unit of work.
         parking_service (ParkingService): Service for managing parking operations.
         file (UploadFile): The image file to process for license plate detection.
+        camera_id (str | None): The id of the camera that took the image, used to select its detection profile.
 
     Returns:
         ParkingResponse: The details of the parking session that was completed.
@@ -71,19 +98,112 @@ async def complete_parking_by_detector(
     Raises:
         HTTPException: If there is an error processing the image, a 404 error is raised with a message.
     """
-    try:
-        image = await file.read()
-        license_plate_text = detector(image)
-        print("license_plate_text= ", license_plate_text)
-    except Exception as e:
-        print({str(e)})
-        raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
-
-    parking = await parking_service.complete_parking(uow, license_plate=license_plate_text.upper())
+    async with gate_events.gate(camera_id):
+        try:
+            image = await file.read()
+            license_plate_text = await detector(image, camera_id)
+            logging.debug(f"Recognized license plate: {license_plate_text}")
+        except Exception as e:
+            logging.error(f"Error processing image: {e}")
+            raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
+
+        license_plate = license_plate_text.upper()
+        async with gate_events.plates([license_plate]):
+            parking = await gate_debounce.run(
+                camera_id,
+                "exit",
+                license_plate,
+                lambda: parking_service.complete_parking(uow, license_plate=license_plate),
+            )
     return parking
 
 
-@router.post("/", response_model=ParkingResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/by_detector/batch", response_model=List[ParkingBatchResult], status_code=status.HTTP_201_CREATED, dependencies=[Depends(admission.slot("gate"))])
+async def start_parkings_by_detector(
+        uow: UOWDep,
+        parking_service: ParkingService = Depends(),
+        file: UploadFile = File(...),
+        camera_id: str | None = Form(None),
+        ):
+    """Start parking sessions for every license plate detected on one image.
+
+    This endpoint is meant for wide-angle cameras covering several lanes. All plates found on the image
+    are recognized in one batch and all sessions are started in one transaction.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        parking_service (ParkingService): Service for managing parking operations.
+        file (UploadFile): The image file to process for license plate detection.
+        camera_id (str | None): The id of the camera that took the image, used to select its detection profile
+            and the parking lot it guards.
+
+    Returns:
+        List[ParkingBatchResult]: The result of starting a parking session for every detected plate.
+
+    Raises:
+        HTTPException: If there is an error processing the image, a 404 error is raised with a message.
+    """
+    async with gate_events.gate(camera_id):
+        try:
+            image = await file.read()
+            license_plates = await multi_detector(image, camera_id)
+        except Exception as e:
+            logging.error(f"Error processing image: {e}")
+            raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
+
+        license_plates = [plate.upper() for plate in license_plates]
+        async with gate_events.plates(license_plates):
+            return await gate_debounce.run_batch(
+                camera_id,
+                "entry",
+                license_plates,
+                lambda pending: parking_service.start_parkings(uow, pending, camera_profiles.get(camera_id).lot_id),
+            )
+
+
+@router.put("/complete_by_detector/batch", response_model=List[ParkingBatchResult], status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("gate"))])
+async def complete_parkings_by_detector(
+        uow: UOWDep,
+        parking_service: ParkingService = Depends(),
+        file: UploadFile = File(...),
+        camera_id: str | None = Form(None),
+):
+    """Complete parking sessions for every license plate detected on one image.
+
+    All plates found on the image are recognized in one batch and all sessions are completed
+    and billed in one transaction.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        parking_service (ParkingService): Service for managing parking operations.
+        file (UploadFile): The image file to process for license plate detection.
+        camera_id (str | None): The id of the camera that took the image, used to select its detection profile.
+
+    Returns:
+        List[ParkingBatchResult]: The result of completing the parking session for every detected plate.
+
+    Raises:
+        HTTPException: If there is an error processing the image, a 404 error is raised with a message.
+    """
+    async with gate_events.gate(camera_id):
+        try:
+            image = await file.read()
+            license_plates = await multi_detector(image, camera_id)
+        except Exception as e:
+            logging.error(f"Error processing image: {e}")
+            raise HTTPException(status_code=404, detail=f"Error processing image: {str(e)}")
+
+        license_plates = [plate.upper() for plate in license_plates]
+        async with gate_events.plates(license_plates):
+            return await gate_debounce.run_batch(
+                camera_id,
+                "exit",
+                license_plates,
+                lambda pending: parking_service.complete_parkings(uow, pending),
+            )
+
+
+@router.post("/", response_model=ParkingResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(admission.slot("gate"))])
 async def start_parking(
         parking_data: ParkingCreate,
         uow: UOWDep,
@@ -103,37 +223,121 @@ async def start_parking(
     Returns:
         ParkingResponse: The details of the parking session that was started.
     """
-    parking = await parking_service.start_parking(uow, license_plate=parking_data.license_plate)
+    async with gate_events.plates([parking_data.license_plate]):
+        parking = await parking_service.start_parking(
+            uow, license_plate=parking_data.license_plate, lot_id=parking_data.lot_id
+        )
+        # A manual event supersedes the last gate event of the plate
+        gate_debounce.forget(parking_data.license_plate)
     return parking
 
 
-@router.get("/", response_model=List[ParkingResponse], status_code=status.HTTP_200_OK)
+@router.post("/events/bulk", response_model=List[ParkingBatchResult], status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("report"))])
+async def apply_parking_events(
+        uow: UOWDep,
+        events: List[ParkingEvent] = Body(..., min_length=1, max_length=settings.PARKING_EVENTS_BATCH_MAX),
+        parking_service: ParkingService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Replay recorded entries and exits in one request.
+
+    This endpoint allows an admin user to reconcile gate events recorded during a network outage. The events
+    are applied in timestamp order, and all sessions are started, completed and billed in one transaction.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        events (List[ParkingEvent]): The license plate, event type and timestamp of every recorded event.
+        parking_service (ParkingService): Service for managing parking operations.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        List[ParkingBatchResult]: The result for every event, in the given order.
+    """
+    license_plates = [event.license_plate for event in events]
+    async with gate_events.plates(license_plates):
+        results = await parking_service.apply_events(uow, events)
+        for license_plate in license_plates:
+            gate_debounce.forget(license_plate)
+    return results
+
+
+@router.get("/", response_model=Page[ParkingResponse], status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("report"))])
 async def get_parkings(
         uow: UOWDep,
+        page: PageParams = Depends(),
         active_only: bool = Query(False, description="Filter active parkings only"),
         parking_service: ParkingService = Depends(),
         current_user: User = Depends(guard.is_admin),
         period: ParkingPeriod = Query(ParkingPeriod.ALL, description="Фільтр по періоду паркінгів"),
 ):
-    """Retrieve a list of parking sessions.
+    """Retrieve parking sessions page by page.
 
-    This endpoint allows an admin user to retrieve a list of parking sessions, optionally filtered by period and activity status.
+    This endpoint allows an admin user to retrieve one page of parking sessions, optionally filtered by period and activity status.
 
     Args:
         uow (UOWDep): Dependency for the unit of work.
+        page (PageParams): The cursor and size of the requested page.
         active_only (bool): Optional filter to include only active parking sessions.
         parking_service (ParkingService): Service for managing parking operations.
         current_user (User): The current user, required to be an admin.
         period (ParkingPeriod): Optional filter to specify the parking period.
 
     Returns:
-        List[ParkingResponse]: A list of parking session objects matching the filters.
+        Page[ParkingResponse]: A page of parking session objects matching the filters and the cursor of the next page.
     """
-    parkings = await parking_service.get_parkings(uow, period, active_only=active_only)
+    parkings = await parking_service.get_parkings(uow, period, page, active_only=active_only)
     return parkings
 
 
-@router.put("/{parking_id}/complete", response_model=ParkingResponse, status_code=status.HTTP_200_OK)
+@router.get("/usage", response_model=List[UsageSummary], status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("report"))])
+async def get_usage_summary(
+        uow: UOWDep,
+        parking_service: ParkingService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+        group_by: SummaryGrouping = Query(SummaryGrouping.DAY, description="Group parkings by day, week, month, rate or car"),
+        date_from: datetime | None = Query(None, description="Only parkings started at or after this time"),
+        date_to: datetime | None = Query(None, description="Only parkings started before this time"),
+):
+    """Retrieve session counts and parked hours of closed parkings per group.
+
+    The parkings are aggregated in the database, so only one row per group is returned.
+    Grouping by rate uses the current rate of every car.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        parking_service (ParkingService): Service for managing parking operations.
+        current_user (User): The current user, required to be an admin.
+        group_by (SummaryGrouping): Whether to group by day, week, month, rate or car.
+        date_from (datetime | None): Only parkings started at or after this time.
+        date_to (datetime | None): Only parkings started before this time.
+
+    Returns:
+        List[UsageSummary]: One summary per group, ordered by the grouping key.
+    """
+    return await parking_service.get_usage_summary(uow, group_by, date_from, date_to)
+
+
+@router.get("/occupancy", response_model=OccupancyResponse, status_code=status.HTTP_200_OK)
+async def get_occupancy(
+        parking_service: ParkingService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Retrieve the current occupancy of the parking.
+
+    The number of active parking sessions is served from the in-memory active-session index,
+    so this endpoint does not query the database.
+
+    Args:
+        parking_service (ParkingService): Service for managing parking operations.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        OccupancyResponse: The number of occupied places and the time of the last reconciliation.
+    """
+    return parking_service.get_occupancy()
+
+
+@router.put("/{parking_id}/complete", response_model=ParkingResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("gate"))])
 async def complete_parking_by_id(
         license_plate: str,
         uow: UOWDep,
@@ -153,5 +357,7 @@ async def complete_parking_by_id(
     Returns:
         ParkingResponse: The details of the completed parking session.
     """
-    parking = await parking_service.complete_parking(uow, license_plate=license_plate)
+    async with gate_events.plates([license_plate]):
+        parking = await parking_service.complete_parking(uow, license_plate=license_plate)
+        gate_debounce.forget(license_plate)
     return parking
@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, status
+
+from app.models.users import User
+from app.schemas.parking_lots import ParkingLotSchemaBase, ParkingLotSchemaUpdate, ParkingLotResponse
+from app.services.parking_lots import ParkingLotsService
+from app.utils.dependencies import UOWDep
+from app.utils.guard import guard
+
+router = APIRouter(prefix="/parking_lots", tags=["Parking lots"])
+
+
+@router.get("/", response_model=list[ParkingLotResponse])
+async def get_parking_lots(
+        uow: UOWDep,
+        lots_service: ParkingLotsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Retrieve all parking lots with their capacity and current occupancy.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        lots_service (ParkingLotsService): Service for managing parking lots.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        list[ParkingLotResponse]: List of all parking lots.
+    """
+    return await lots_service.get_lots(uow)
+
+
+@router.get("/{lot_id}", response_model=ParkingLotResponse, status_code=status.HTTP_200_OK)
+async def get_parking_lot(
+        uow: UOWDep,
+        lot_id: int,
+        lots_service: ParkingLotsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Retrieve a parking lot by its ID.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        lot_id (int): The ID of the parking lot to retrieve.
+        lots_service (ParkingLotsService): Service for managing parking lots.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        ParkingLotResponse: The parking lot with its current occupancy.
+    """
+    return await lots_service.get_lot_by_id(uow, lot_id)
+
+
+@router.post("/", response_model=ParkingLotResponse, status_code=status.HTTP_201_CREATED)
+async def add_parking_lot(
+        uow: UOWDep,
+        lot_data: ParkingLotSchemaBase,
+        lots_service: ParkingLotsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Add a new parking lot.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        lot_data (ParkingLotSchemaBase): The name and capacity of the new parking lot.
+        lots_service (ParkingLotsService): Service for managing parking lots.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        ParkingLotResponse: The newly created parking lot.
+    """
+    lot_id = await lots_service.add_lot(uow, lot_data)
+    return await lots_service.get_lot_by_id(uow, lot_id)
+
+
+@router.put("/{lot_id}", response_model=ParkingLotResponse, status_code=status.HTTP_200_OK)
+async def update_parking_lot(
+        uow: UOWDep,
+        lot_id: int,
+        lot_data: ParkingLotSchemaUpdate,
+        lots_service: ParkingLotsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Update the name and capacity of a parking lot.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        lot_id (int): The ID of the parking lot to update.
+        lot_data (ParkingLotSchemaUpdate): The updated data for the parking lot.
+        lots_service (ParkingLotsService): Service for managing parking lots.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        ParkingLotResponse: The updated parking lot.
+    """
+    return await lots_service.update_lot(uow, lot_id, lot_data)
@@ -1,41 +1,78 @@
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, status, Query  # type: ignore
 
 from app.schemas.payment import PaymentSchemaAdd, PaymentResponse, PaymentSchema, PaymentPeriod
 from app.schemas.parking import ParkingCreate
+from app.schemas.pagination import Page
+from app.schemas.reports import RevenueSummary, SummaryGrouping
 
 from app.services.payments import PaymentsService
 from app.services.auth import auth_service
 from app.utils.guard import guard
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
+from app.utils.pagination import PageParams
 from app.models.users import User
 
 router = APIRouter(prefix="/payments", tags=["Payments"])
 
 
-@router.get("/", response_model=list[PaymentResponse])
+@router.get("/", response_model=Page[PaymentResponse], dependencies=[Depends(admission.slot("report"))])
 async def get_payments(
         uow: UOWDep,
+        page: PageParams = Depends(),
         payments_service: PaymentsService = Depends(),
         current_user: User = Depends(guard.is_admin),
         period: PaymentPeriod = Query(PaymentPeriod.ALL, description="Фільтр по періоду платежів"),
 ):
-    """Retrieve all payments with an optional filter by period.
+    """Retrieve payments page by page with an optional filter by period.
 
-    This endpoint allows an admin user to retrieve a list of all payments, optionally filtered by a specified period.
+    This endpoint allows an admin user to retrieve one page of payments, optionally filtered by a specified period.
 
     Args:
         uow (UOWDep): Dependency for the unit of work.
+        page (PageParams): The cursor and size of the requested page.
         payments_service (PaymentsService): Service for managing payments.
         current_user (User): The current user, required to be an admin.
         period (PaymentPeriod): Optional filter to specify the payment period.
 
     Returns:
-        list[PaymentResponse]: A list of payment objects, filtered by the specified period if provided.
+        Page[PaymentResponse]: A page of payment objects, filtered by the specified period if provided,
+        and the cursor of the next page.
     """
-    payments = await payments_service.get_all_payments(uow, period)
+    payments = await payments_service.get_all_payments(uow, period, page)
     return payments
 
 
+@router.get("/summary", response_model=list[RevenueSummary], dependencies=[Depends(admission.slot("report"))])
+async def get_revenue_summary(
+        uow: UOWDep,
+        payments_service: PaymentsService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+        group_by: SummaryGrouping = Query(SummaryGrouping.DAY, description="Group payments by day, week, month, rate or car"),
+        date_from: datetime | None = Query(None, description="Only payments made at or after this time"),
+        date_to: datetime | None = Query(None, description="Only payments made before this time"),
+):
+    """Retrieve payment totals, counts and averages per group.
+
+    The payments are aggregated in the database, so only one row per group is returned.
+    Grouping by rate uses the current rate of every car.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        payments_service (PaymentsService): Service for managing payments.
+        current_user (User): The current user, required to be an admin.
+        group_by (SummaryGrouping): Whether to group by day, week, month, rate or car.
+        date_from (datetime | None): Only payments made at or after this time.
+        date_to (datetime | None): Only payments made before this time.
+
+    Returns:
+        list[RevenueSummary]: One summary per group, ordered by the grouping key.
+    """
+    return await payments_service.get_revenue_summary(uow, group_by, date_from, date_to)
+
+
 @router.get("/{payment_id}", response_model=PaymentResponse, status_code=status.HTTP_200_OK)
 async def get_payment_by_id(
         payment_id: int,
@@ -67,6 +104,7 @@ async def get_payments_by_license_plate(
         uow: UOWDep,
         payments_service: PaymentsService = Depends(),
         current_user: User = Depends(guard.is_admin),
+        include_archived: bool = Query(False, description="Include payments moved to the archive"),
 ):
     """Retrieve payments associated with a specific license plate.
 
@@ -77,11 +115,12 @@ async def get_payments_by_license_plate(
         uow (UOWDep): Dependency for the unit of work.
         payments_service (PaymentsService): Service for managing payments.
         current_user (User): The current user, required to be an admin.
+        include_archived (bool): Whether to include payments moved to the archive.
 
     Returns:
         list[PaymentResponse]: A list of payment objects associated with the specified license plate.
     """
-    payments = await payments_service.get_payments_by_license_plate(uow, license_plate)
+    payments = await payments_service.get_payments_by_license_plate(uow, license_plate, include_archived)
     return payments
 
 
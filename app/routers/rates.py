@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, status
 
 from app.models.users import User
 from app.models.cars import Car
-from app.schemas.rates import RateSchemaBase, RateSchemaUpdate, RateResponse
+from app.schemas.rates import RateSchemaBase, RateSchemaUpdate, RateResponse, TariffSimulationRequest, \
+    TariffSimulationResponse
 from app.services.auth import auth_service
 from app.services.rates import RatesService
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
 from app.utils.guard import guard
 
@@ -78,6 +80,30 @@ async def add_rate(
     return await rates_service.get_rate_by_id(uow, rate_id)
 
 
+@router.post("/simulate", response_model=TariffSimulationResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("report"))])
+async def simulate_tariff(
+        uow: UOWDep,
+        simulation: TariffSimulationRequest,
+        rates_service: RatesService = Depends(),
+        current_user: User = Depends(guard.is_admin),
+):
+    """Estimate the revenue impact of changing hourly rates.
+
+    This endpoint allows an admin user to re-bill the closed sessions of a period, by default the previous
+    calendar month, under candidate hourly rates before updating them. No rate is changed.
+
+    Args:
+        uow (UOWDep): Dependency for the unit of work.
+        simulation (TariffSimulationRequest): The candidate hourly rates by rate ID and the period to re-bill.
+        rates_service (RatesService): Service for managing rates.
+        current_user (User): The current user, required to be an admin.
+
+    Returns:
+        TariffSimulationResponse: The current and simulated revenue in total, per rate and for the most affected users.
+    """
+    return await rates_service.simulate_tariff(uow, simulation)
+
+
 @router.put("/{rate_id}", response_model=RateResponse, status_code=status.HTTP_200_OK)
 async def update_rate(
         uow: UOWDep,
@@ -1,32 +1,37 @@
 from fastapi import APIRouter, Depends, status, Query  # type: ignore
 
+from app.schemas.pagination import Page
 from app.schemas.transactions import TransactionSchemaAdd, TransactionResponse
 from app.services.transactions import TransactionsService
 from app.services.auth import auth_service
 from app.utils.guard import guard
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
+from app.utils.pagination import PageParams
 from app.models.users import User
 
 router = APIRouter(prefix="/transactions", tags=["Transaction"])
 
 
-@router.get("/", response_model=list[TransactionResponse])
+@router.get("/", response_model=Page[TransactionResponse], dependencies=[Depends(admission.slot("report"))])
 async def get_transactions(
         uow: UOWDep,
+        page: PageParams = Depends(),
         transactions_service: TransactionsService = Depends(),
         current_user: User = Depends(guard.is_admin),
 ):
-    """Retrieve all transactions.
+    """Retrieve transactions page by page.
 
     Args:
         uow (UOWDep): Dependency for the unit of work.
+        page (PageParams): The cursor and size of the requested page.
         transactions_service (TransactionsService): Service for managing transactions.
         current_user (User): The current user, must be an admin.
 
     Returns:
-        list[TransactionResponse]: List of transactions.
+        Page[TransactionResponse]: A page of transactions and the cursor of the next page.
     """
-    transactions = await transactions_service.get_all_transactions(uow)
+    transactions = await transactions_service.get_all_transactions(uow, page)
     return transactions
 
 
@@ -52,25 +57,27 @@ async def get_transaction_by_id(
     return transaction
 
 
-@router.get("/{user_id}/transactions", response_model=list[TransactionResponse])
+@router.get("/{user_id}/transactions", response_model=Page[TransactionResponse])
 async def get_transactions_by_user_id(
         uow: UOWDep,
         user_id: int,
+        page: PageParams = Depends(),
         transactions_service: TransactionsService = Depends(),
         current_user: User = Depends(auth_service.get_current_user),
-) -> list[TransactionResponse]:
-    """Retrieve transactions by user ID.
+) -> Page[TransactionResponse]:
+    """Retrieve transactions by user ID page by page.
 
     Args:
         uow (UOWDep): Dependency for the unit of work.
         user_id (int): ID of the user to retrieve transactions for.
+        page (PageParams): The cursor and size of the requested page.
         transactions_service (TransactionsService): Service for managing transactions.
         current_user (User): The current user, required for authentication.
 
     Returns:
-        list[TransactionResponse]: List of transactions associated with the specified user.
+        Page[TransactionResponse]: A page of transactions associated with the specified user.
     """
-    transactions = await transactions_service.get_transactions_by_user_id(uow, user_id)
+    transactions = await transactions_service.get_transactions_by_user_id(uow, user_id, page)
     # transactions = await uow.transactions.find_by_user_id(user_id=user_id)
     return transactions
 
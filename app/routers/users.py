@@ -1,32 +1,37 @@
 from fastapi import APIRouter, Depends, status
 
 from app.models import User
+from app.schemas.pagination import Page
 from app.schemas.users import UserResponse, UserSchemaUpdate
 from app.services.auth import auth_service
 from app.services.users import UsersService
+from app.utils.admission import admission
 from app.utils.dependencies import UOWDep
 from app.utils.guard import guard
+from app.utils.pagination import PageParams
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-@router.get("/", response_model=list[UserResponse])
+@router.get("/", response_model=Page[UserResponse], dependencies=[Depends(admission.slot("report"))])
 async def get_users(
     uow: UOWDep,
+    page: PageParams = Depends(),
     user_service: UsersService = Depends(),
     current_user: User = Depends(guard.is_admin),
 ):
-    """Retrieve all users.
+    """Retrieve users page by page.
 
     Args:
         uow (UOWDep): Dependency for the unit of work.
+        page (PageParams): The cursor and size of the requested page.
         user_service (UsersService): Service for managing users.
         current_user (User): The current user, must be an admin.
 
     Returns:
-        list[UserResponse]: List of users.
+        Page[UserResponse]: A page of users and the cursor of the next page.
     """
-    users = await user_service.get_users(uow)
+    users = await user_service.get_users(uow, page)
     return users
 
 
@@ -51,7 +56,7 @@ async def get_user(
     return await user_service.get_user_by_id(uow, user_id)
 
 
-@router.put("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK)
+@router.put("/{user_id}", response_model=UserResponse, status_code=status.HTTP_200_OK, dependencies=[Depends(admission.slot("auth"))])
 async def update_user(
     user_data: UserSchemaUpdate,
     uow: UOWDep,
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from pydantic import BaseModel, confloat, conint, model_validator
+
+
+class CameraProfileSchemaUpdate(BaseModel):
+    roi: Optional[tuple[conint(ge=0), conint(ge=0), conint(ge=1), conint(ge=1)]] = None
+    min_plate_size: Optional[tuple[conint(ge=1), conint(ge=1)]] = None
+    max_plate_size: Optional[tuple[conint(ge=1), conint(ge=1)]] = None
+    scale_factor: confloat(gt=1.0) = 1.2
+    min_neighbors: conint(ge=0) = 7
+    min_ratio: confloat(gt=0) = 2.0
+    max_ratio: confloat(gt=0) = 8.0
+    lot_id: Optional[conint(ge=1)] = None
+    debounce_seconds: Optional[confloat(ge=0)] = None
+
+    @model_validator(mode="after")
+    def ranges_are_ordered(self):
+        # An inverted range matches no rectangle, so the camera would never detect a plate
+        if self.min_ratio > self.max_ratio:
+            raise ValueError("min_ratio must not be greater than max_ratio")
+        if self.min_plate_size and self.max_plate_size and any(
+                low > high for low, high in zip(self.min_plate_size, self.max_plate_size)
+        ):
+            raise ValueError("min_plate_size must not be greater than max_plate_size")
+        return self
+
+    class Config:
+        from_attributes = True
+
+
+class CameraProfile(CameraProfileSchemaUpdate):
+    camera_id: str
@@ -6,12 +6,14 @@ from enum import Enum
 
 class ParkingCreate(BaseModel):
     license_plate: str
+    lot_id: int | None = None
 
 
 class ParkingResponse(BaseModel):
     id: conint(ge=1)
     car_id: int
     license_plate: str
+    lot_id: int | None = None
     is_active: bool
     start_time: datetime
     end_time: datetime | None
@@ -20,9 +22,33 @@ class ParkingResponse(BaseModel):
         from_attributes = True
 
 
+class ParkingEventType(Enum):
+    ENTRY = "entry"
+    EXIT = "exit"
+
+
+class ParkingEvent(BaseModel):
+    license_plate: str
+    event_type: ParkingEventType
+    timestamp: datetime
+    lot_id: int | None = None
+
+
+class ParkingBatchResult(BaseModel):
+    license_plate: str
+    parking: ParkingResponse | None = None
+    detail: str | None = None
+
+
+class OccupancyResponse(BaseModel):
+    occupied: int
+    reconciled_at: datetime | None
+
+
 class ParkingLiteResponse(BaseModel):
     id: conint(ge=1)
     car_id: int
+    lot_id: int | None = None
     is_active: bool
     start_time: datetime
     end_time: datetime | None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, conint
+
+
+class ParkingLotSchemaBase(BaseModel):
+    name: str
+    capacity: conint(ge=0)
+
+    class Config:
+        from_attributes = True
+
+
+class ParkingLotSchemaUpdate(ParkingLotSchemaBase):
+    pass
+
+
+class ParkingLotResponse(ParkingLotSchemaBase):
+    id: conint(ge=1)
+    occupied: int
@@ -1,11 +1,35 @@
+from datetime import datetime
 from typing import Optional
 
-from pydantic import BaseModel, conint
+from pydantic import BaseModel, confloat, conint, field_validator
+
+
+class TariffBand(BaseModel):
+    # Minute of the local day the band starts at; a band lasts until the next one starts
+    start_minute: conint(ge=0, le=24 * 60 - 1)
+    hourly_rate: confloat(ge=0)
+
+
+class Tariff(BaseModel):
+    bands: list[TariffBand]
+    free_minutes: conint(ge=0) = 0
+    daily_cap: Optional[confloat(ge=0)] = None
+    # Offset of the local time the bands are defined in from UTC
+    utc_offset_minutes: conint(ge=-12 * 60, le=14 * 60) = 0
+
+    @field_validator("bands")
+    def bands_cover_the_day(cls, bands):
+        starts = [band.start_minute for band in bands]
+        if not starts or starts[0] != 0 or starts != sorted(set(starts)):
+            raise ValueError("Bands must start at minute 0 and be ordered by distinct start minutes")
+        return bands
 
 
 class RateSchemaBase(BaseModel):
     name: str
     hourly_rate: float
+    # Without a tariff, every started hour is charged at the hourly rate
+    tariff: Optional[Tariff] = None
 
     class Config:
         from_attributes = True
@@ -18,3 +42,42 @@ class RateSchemaUpdate(RateSchemaBase):
 class RateResponse(RateSchemaBase):
     id: conint(ge=1)
 
+
+class TariffSimulationRequest(BaseModel):
+    # Candidate hourly rate by rate ID; rates not listed keep their current hourly rate
+    hourly_rates: dict[int, confloat(ge=0)]
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    top_users: conint(ge=0) = 100
+
+
+class RateImpact(BaseModel):
+    rate_id: int
+    name: str
+    sessions: int
+    current_hourly_rate: float
+    simulated_hourly_rate: float
+    current_revenue: float
+    simulated_revenue: float
+    delta: float
+
+
+class UserImpact(BaseModel):
+    user_id: int
+    sessions: int
+    current_revenue: float
+    simulated_revenue: float
+    delta: float
+
+
+class TariffSimulationResponse(BaseModel):
+    date_from: datetime
+    date_to: datetime
+    sessions: int
+    current_revenue: float
+    simulated_revenue: float
+    delta: float
+    by_rate: list[RateImpact]
+    by_user: list[UserImpact]
+    # Rates priced by a tariff are not simulated; their sessions are left out of all figures
+    excluded_rate_ids: list[int] = []
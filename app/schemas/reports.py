@@ -0,0 +1,32 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class SummaryGrouping(Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    RATE = "rate"
+    CAR = "car"
+
+
+class RevenueSummary(BaseModel):
+    # Only the key of the requested grouping is set
+    period_start: datetime | None = None
+    rate_id: int | None = None
+    car_id: int | None = None
+    payments: int
+    total_amount: float
+    average_amount: float
+
+
+class UsageSummary(BaseModel):
+    # Only the key of the requested grouping is set
+    period_start: datetime | None = None
+    rate_id: int | None = None
+    car_id: int | None = None
+    sessions: int
+    total_hours: float
+    average_hours: float
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from datetime import datetime
+
+from app.core.config import settings
+from app.schemas.parking import ParkingResponse
+from app.utils.unitofwork import UnitOfWork
+
+
+class ActiveSessionIndex:
+    """
+    Process-local index of active parking sessions, keyed by car id and by license plate.
+
+    The index is seeded at startup, maintained by the parking service after every committed start
+    and completion, and periodically reconciled against the database. It answers occupancy and
+    active-session queries without touching Postgres; gate decisions are always made by the database.
+    Because it is process-local, sessions changed by other workers are picked up at the next
+    reconciliation.
+    """
+
+    def __init__(self):
+        self.by_car: dict[int, ParkingResponse] = {}
+        self.car_by_plate: dict[str, int] = {}
+        self.reconciled_at: datetime | None = None
+        # Changes made while a reconciliation reads its snapshot, replayed over the snapshot
+        self.pending: dict[int, ParkingResponse | None] | None = None
+
+    @property
+    def occupancy(self) -> int:
+        return len(self.by_car)
+
+    def add(self, parking: ParkingResponse) -> None:
+        self.by_car[parking.car_id] = parking
+        self.car_by_plate[parking.license_plate] = parking.car_id
+        if self.pending is not None:
+            self.pending[parking.car_id] = parking
+
+    def remove(self, car_id: int) -> None:
+        parking = self.by_car.pop(car_id, None)
+        if parking is not None:
+            self.car_by_plate.pop(parking.license_plate, None)
+        if self.pending is not None:
+            self.pending[car_id] = None
+
+    def get_by_plate(self, license_plate: str) -> ParkingResponse | None:
+        car_id = self.car_by_plate.get(license_plate)
+        return None if car_id is None else self.by_car.get(car_id)
+
+    def get_by_car(self, car_id: int) -> ParkingResponse | None:
+        return self.by_car.get(car_id)
+
+    def all(self) -> list[ParkingResponse]:
+        return list(self.by_car.values())
+
+    async def reload(self, uow: UnitOfWork) -> None:
+        """
+        Replaces the index with the active sessions currently stored in the database.
+
+        Starts and completions committed by this worker while the snapshot is read are replayed over
+        the snapshot, so they are neither lost nor brought back.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+        """
+        by_car = {}
+        self.pending = {}
+        try:
+            async with uow:
+                async for row in uow.parkings.stream_active_sessions():
+                    by_car[row.car_id] = ParkingResponse(
+                        id=row.id,
+                        car_id=row.car_id,
+                        license_plate=row.license_plate,
+                        lot_id=row.lot_id,
+                        is_active=True,
+                        start_time=row.start_time,
+                        end_time=None,
+                    )
+            for car_id, parking in self.pending.items():
+                if parking is None:
+                    by_car.pop(car_id, None)
+                else:
+                    by_car[car_id] = parking
+        finally:
+            self.pending = None
+        self.by_car = by_car
+        self.car_by_plate = {parking.license_plate: car_id for car_id, parking in by_car.items()}
+        self.reconciled_at = datetime.utcnow()
+
+    async def reconcile_forever(self, interval: float = settings.ACTIVE_SESSIONS_RECONCILE_SECONDS) -> None:
+        """
+        Reconciles the index against the database every `interval` seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload(UnitOfWork())
+            except Exception as e:
+                logging.error(f"Error reconciling active parking sessions: {e}")
+
+
+active_sessions = ActiveSessionIndex()
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -89,7 +90,8 @@ class AuthService:
         """
         async with uow:
             user = await uow.users.find_one_or_none(email=email)
-            if user is None or not self.verify_password(password, user.hashed_password):
+            # bcrypt is CPU-bound, so it runs in the threadpool instead of blocking the event loop
+            if user is None or not await run_in_threadpool(self.verify_password, password, user.hashed_password):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid credentials",
@@ -3,6 +3,8 @@ from fastapi import HTTPException, status
 from app.models import Car, BlackList
 from app.utils.unitofwork import UnitOfWork
 from app.schemas.black_list import BlackListResponse, BlackListSchemaAdd, BlackListSchema
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, make_page
 
 
 class BlackListService:
@@ -45,28 +47,30 @@ class BlackListService:
             return black_response
 
     @staticmethod
-    async def get_black_list(uow: UnitOfWork):
+    async def get_black_list(uow: UnitOfWork, page: PageParams) -> Page[BlackListResponse]:
         """
-        Retrieves the list of all blacklisted cars.
+        Retrieves one page of blacklisted cars.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list[BlackListResponse]: A list of blacklisted car details.
+            Page[BlackListResponse]: A page of blacklisted car details.
         """
         async with uow:
-            output_data = []
-            black_list = await uow.black_list.find_all()
-            for record in black_list:
-                car = await uow.cars.find_one(id=record.car_id)
-                output_data.append(BlackListResponse(
+            # License plates are joined in the same query
+            black_list, next_id = await uow.black_list.find_page_with_plates(page.after_id, page.limit)
+            output_data = [
+                BlackListResponse(
                     id=record.id,
                     car_id=record.car_id,
-                    license_plate=car.license_plate,
+                    license_plate=record.license_plate,
                     reason=record.reason,
-                ))
-            return output_data
+                )
+                for record in black_list
+            ]
+            return make_page(output_data, next_id)
 
     @staticmethod
     async def delete_black_list(uow: UnitOfWork, license_plate: str):
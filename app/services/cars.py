@@ -3,6 +3,8 @@ from fastapi import HTTPException, status
 from app.models import Car
 from app.utils.unitofwork import UnitOfWork
 from app.schemas.cars import CarSchemaAdd, CarSchemaUpdate, CarResponse
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, make_page
 
 
 class CarsService:
@@ -40,19 +42,20 @@ class CarsService:
             car_id = await uow.cars.add_one(car_dict)
             return car_id
 
-    async def get_cars(self, uow: UnitOfWork):
+    async def get_cars(self, uow: UnitOfWork, page: PageParams) -> Page[CarResponse]:
         """
-        Retrieves a list of all cars.
+        Retrieves one page of cars.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list[Car]: A list of all cars.
+            Page[CarResponse]: A page of cars.
         """
         async with uow:
-            cars = await uow.cars.find_all()
-            return cars
+            cars, next_id = await uow.cars.find_page(page.after_id, page.limit)
+            return make_page([CarResponse.model_validate(car) for car in cars], next_id)
 
     async def get_car_by_id(self, uow: UnitOfWork, car_id: int) -> CarResponse:
         """
@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import Row
+
+from app.schemas.exports import ExportFormat
+from app.utils.unitofwork import UnitOfWork
+
+# Encoded output is sent to the client in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+PARKING_COLUMNS = ["id", "car_id", "license_plate", "lot_id", "is_active", "start_time", "end_time"]
+PAYMENT_COLUMNS = ["id", "car_id", "license_plate", "parking_id", "amount", "payment_date", "description"]
+TRANSACTION_COLUMNS = ["id", "user_id", "amount", "created_at"]
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+class ExportService:
+    """
+    Service class for exporting parkings, payments and transactions as CSV or NDJSON streams.
+
+    Rows are read from a server-side cursor and encoded chunk by chunk, so an export of any size
+    runs in constant memory and nothing is written to the server's disk.
+    """
+
+    @staticmethod
+    def export_parkings(
+            uow: UnitOfWork,
+            export_format: ExportFormat,
+            compress: bool = False,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            license_plate: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the parkings matching the filters.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            export_format (ExportFormat): CSV or NDJSON.
+            compress (bool): Whether to gzip the output.
+            date_from (datetime | None): Only parkings started at or after this time.
+            date_to (datetime | None): Only parkings started before this time.
+            license_plate (str | None): Only parkings of the car with this plate.
+
+        Returns:
+            AsyncIterator[bytes]: The encoded export.
+        """
+        return ExportService._export(
+            uow,
+            lambda: uow.parkings.stream_for_export(date_from, date_to, license_plate),
+            PARKING_COLUMNS,
+            export_format,
+            compress,
+        )
+
+    @staticmethod
+    def export_payments(
+            uow: UnitOfWork,
+            export_format: ExportFormat,
+            compress: bool = False,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            license_plate: str | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the payments matching the filters.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            export_format (ExportFormat): CSV or NDJSON.
+            compress (bool): Whether to gzip the output.
+            date_from (datetime | None): Only payments made at or after this time.
+            date_to (datetime | None): Only payments made before this time.
+            license_plate (str | None): Only payments of the car with this plate.
+
+        Returns:
+            AsyncIterator[bytes]: The encoded export.
+        """
+        return ExportService._export(
+            uow,
+            lambda: uow.payments.stream_for_export(date_from, date_to, license_plate),
+            PAYMENT_COLUMNS,
+            export_format,
+            compress,
+        )
+
+    @staticmethod
+    def export_transactions(
+            uow: UnitOfWork,
+            export_format: ExportFormat,
+            compress: bool = False,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            user_id: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the transactions matching the filters.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            export_format (ExportFormat): CSV or NDJSON.
+            compress (bool): Whether to gzip the output.
+            date_from (datetime | None): Only transactions created at or after this time.
+            date_to (datetime | None): Only transactions created before this time.
+            user_id (int | None): Only transactions of this user.
+
+        Returns:
+            AsyncIterator[bytes]: The encoded export.
+        """
+        return ExportService._export(
+            uow,
+            lambda: uow.transactions.stream_for_export(date_from, date_to, user_id),
+            TRANSACTION_COLUMNS,
+            export_format,
+            compress,
+        )
+
+    @staticmethod
+    async def _export(
+            uow: UnitOfWork,
+            rows: Callable[[], AsyncIterator[Row]],
+            columns: list[str],
+            export_format: ExportFormat,
+            compress: bool,
+    ) -> AsyncIterator[bytes]:
+        # The unit of work is opened by the generator itself, because the response
+        # is streamed after the endpoint has returned
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        async with uow:
+            async for chunk in ExportService._encode(rows(), columns, export_format):
+                if compressor is None:
+                    yield chunk
+                else:
+                    compressed = compressor.compress(chunk)
+                    if compressed:
+                        yield compressed
+        if compressor is not None:
+            yield compressor.flush()
+
+    @staticmethod
+    async def _encode(rows: AsyncIterator[Row], columns: list[str], export_format: ExportFormat) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.CSV:
+            writer.writerow(columns)
+
+        async for row in rows:
+            values = [_plain(value) for value in row]
+            if export_format == ExportFormat.CSV:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values)), ensure_ascii=False))
+                buffer.write("\n")
+
+            if buffer.tell() >= CHUNK_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
@@ -0,0 +1,103 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+from app.data_science.camera_profiles import camera_profiles
+from app.schemas.parking import ParkingBatchResult, ParkingResponse
+
+
+@dataclass
+class GateEvent:
+    gate_id: str | None
+    direction: str
+    parking: ParkingResponse
+    expires_at: float
+
+
+class GateDebounce:
+    """
+    Answers repeated detections of the same plate at the same gate from memory.
+
+    Only the latest processed event of every plate is kept. A detection with the same gate and
+    direction inside the debounce window of the gate gets the session of that event back without
+    reaching the parking service; any other event for the plate replaces it. Callers must hold the
+    plate lock of the gate event dispatcher, so a repeat cannot overtake the event it repeats.
+    """
+
+    def __init__(self, window: float = settings.GATE_DEBOUNCE_SECONDS, max_plates: int = settings.GATE_DEBOUNCE_MAX_PLATES):
+        self.window = window
+        self.max_plates = max_plates
+        self.events: OrderedDict[str, GateEvent] = OrderedDict()
+
+    def window_for(self, gate_id: str | None) -> float:
+        debounce_seconds = camera_profiles.get(gate_id).debounce_seconds
+        return self.window if debounce_seconds is None else debounce_seconds
+
+    def get(self, gate_id: str | None, direction: str, license_plate: str) -> ParkingResponse | None:
+        event = self.events.get(license_plate)
+        if event is None or event.gate_id != gate_id or event.direction != direction:
+            return None
+        if event.expires_at <= time.monotonic():
+            del self.events[license_plate]
+            return None
+        return event.parking
+
+    def remember(self, gate_id: str | None, direction: str, parking: ParkingResponse) -> None:
+        self.events[parking.license_plate] = GateEvent(
+            gate_id, direction, parking, time.monotonic() + self.window_for(gate_id)
+        )
+        self.events.move_to_end(parking.license_plate)
+        while len(self.events) > self.max_plates:
+            self.events.popitem(last=False)
+
+    def forget(self, license_plate: str) -> None:
+        self.events.pop(license_plate, None)
+
+    async def run(
+            self,
+            gate_id: str | None,
+            direction: str,
+            license_plate: str,
+            operation: Callable[[], Awaitable[ParkingResponse]],
+    ) -> ParkingResponse:
+        """
+        Returns the session of a repeated event, or runs the operation and remembers its session.
+        """
+        parking = self.get(gate_id, direction, license_plate)
+        if parking is None:
+            parking = await operation()
+            self.remember(gate_id, direction, parking)
+        return parking
+
+    async def run_batch(
+            self,
+            gate_id: str | None,
+            direction: str,
+            license_plates: list[str],
+            operation: Callable[[list[str]], Awaitable[list[ParkingBatchResult]]],
+    ) -> list[ParkingBatchResult]:
+        """
+        Answers the repeated plates of a frame from memory and runs the operation for the rest.
+
+        Returns:
+            list[ParkingBatchResult]: The result for every license plate, in the given order.
+        """
+        results = {}
+        pending = []
+        for license_plate in license_plates:
+            parking = self.get(gate_id, direction, license_plate)
+            if parking is None:
+                if license_plate not in pending:
+                    pending.append(license_plate)
+            else:
+                results[license_plate] = ParkingBatchResult(license_plate=license_plate, parking=parking)
+        for result in await operation(pending) if pending else []:
+            if result.parking is not None:
+                self.remember(gate_id, direction, result.parking)
+            results[result.license_plate] = result
+        return [results[license_plate] for license_plate in license_plates]
+
+
+gate_debounce = GateDebounce()
@@ -0,0 +1,114 @@
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from app.utils.unitofwork import UnitOfWork
+from app.schemas.parking_lots import ParkingLotResponse, ParkingLotSchemaBase, ParkingLotSchemaUpdate
+
+
+class ParkingLotsService:
+    """
+    Service class for managing parking lots and their capacities.
+    """
+
+    async def add_lot(self, uow: UnitOfWork, lot_data: ParkingLotSchemaBase) -> int:
+        """
+        Adds a new parking lot to the database.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            lot_data (ParkingLotSchemaBase): The data for the new parking lot.
+
+        Returns:
+            int: The ID of the newly created parking lot.
+
+        Raises:
+            HTTPException: If a parking lot with the same name already exists.
+        """
+        lot_dict = lot_data.model_dump()
+        async with uow:
+            if await uow.parking_lots.find_one_or_none(name=lot_dict["name"]):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Parking lot with this name already exists.",
+                )
+            return await uow.parking_lots.add_one(lot_dict)
+
+    async def get_lots(self, uow: UnitOfWork):
+        """
+        Retrieves all parking lots with their current occupancy.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+
+        Returns:
+            list[ParkingLotResponse]: A list of all parking lots.
+        """
+        async with uow:
+            return await uow.parking_lots.find_all()
+
+    async def get_lot_by_id(self, uow: UnitOfWork, lot_id: int) -> ParkingLotResponse:
+        """
+        Retrieves a specific parking lot by its ID.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            lot_id (int): The ID of the parking lot to be retrieved.
+
+        Returns:
+            ParkingLotResponse: The parking lot data.
+
+        Raises:
+            HTTPException: If the parking lot with the specified ID is not found.
+        """
+        async with uow:
+            lot = await uow.parking_lots.find_one_or_none(id=lot_id)
+            if lot is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="Parking lot not found"
+                )
+            return lot
+
+    async def update_lot(
+            self, uow: UnitOfWork, lot_id: int, lot_data: ParkingLotSchemaUpdate
+    ) -> ParkingLotResponse:
+        """
+        Updates the name and capacity of a parking lot.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            lot_id (int): The ID of the parking lot to be updated.
+            lot_data (ParkingLotSchemaUpdate): The new data for the parking lot.
+
+        Returns:
+            ParkingLotResponse: The updated parking lot data.
+
+        Raises:
+            HTTPException: If the parking lot is not found, another parking lot has the new name,
+            or the new capacity is below the current occupancy.
+        """
+        async with uow:
+            namesake = await uow.parking_lots.find_one_or_none(name=lot_data.name)
+            if namesake is not None and namesake.id != lot_id:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Parking lot with this name already exists.",
+                )
+            try:
+                lot = await uow.parking_lots.resize(lot_id, lot_data.model_dump())
+            except IntegrityError:
+                # Another lot took the name after the check
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Parking lot with this name already exists.",
+                )
+            if lot is None:
+                if await uow.parking_lots.find_one_or_none(id=lot_id) is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND, detail="Parking lot not found"
+                    )
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Capacity cannot be lower than the number of occupied places.",
+                )
+            response = ParkingLotResponse.model_validate(lot)
+            await uow.commit()
+            return response
@@ -1,10 +1,19 @@
-from datetime import datetime, timedelta
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.archive import cold_archive
 from app.models.parking import Parking
-from app.schemas.parking import ParkingResponse, ParkingPeriod, ParkingLiteResponse
+from app.schemas.parking import ParkingResponse, ParkingPeriod, ParkingLiteResponse, ParkingBatchResult, \
+    OccupancyResponse, ParkingEvent, ParkingEventType
 from app.schemas.payment import PaymentSchemaAdd
+from app.services.active_sessions import active_sessions
 from app.services.payments import PaymentsService
+from app.schemas.pagination import Page
+from app.schemas.reports import SummaryGrouping, UsageSummary
 from app.utils.guard import guard
+from app.utils.pagination import PageParams, make_page
 from app.utils.unitofwork import UnitOfWork
 from app.core.config import settings
 
@@ -15,51 +24,28 @@ class ParkingService:
     """
 
     @staticmethod
-    async def start_parking(uow: UnitOfWork, license_plate: str) -> Parking:
+    async def start_parking(uow: UnitOfWork, license_plate: str, lot_id: int | None = None) -> Parking:
         """
         Starts a parking session for a car with the given license plate.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             license_plate (str): The license plate of the car to start parking for.
+            lot_id (int | None): The parking lot the car enters. Sessions without a lot are not capacity checked.
 
         Returns:
             ParkingResponse: The response object containing parking details.
 
         Raises:
-            HTTPException: If the car is not found or is already parked.
-        """        
+            HTTPException: If the car is not found, is already parked, or the parking lot is full.
+        """
+        # Whether the car is already parked is decided by the atomic `cars.parked_since` claim, not by the
+        # active-session index, which may not have seen a completion or a sweep on another worker yet
         async with uow:
-            car = await uow.cars.find_one_or_none(license_plate=license_plate)
-            if car is None:
-                raise HTTPException(status_code=404, detail="Car not found")
-            await guard.blacklisted(uow, car.id)
-            active_parking = await uow.parkings.find_one_or_none(car_id=car.id, is_active=True)
-            if active_parking:
-                raise HTTPException(status_code=400, detail="This car is already parked.")
-            # guard.positive_balance(current_user, settings.PARKING_HOURLY_RATE)
-            parking = Parking(
-                car_id=car.id,                
-                start_time=datetime.utcnow(),
-                is_active=True,
-                end_time=None,
-            )
-
-            uow.session.add(parking)
-
-            await uow.commit()
-
-            await uow.session.refresh(parking)
-
-            return ParkingResponse(
-                id=parking.id,
-                car_id=parking.car_id,
-                license_plate=license_plate,
-                is_active=parking.is_active,
-                start_time=parking.start_time,
-                end_time=parking.end_time
-            )
-
+            parking = await ParkingService._start(uow, license_plate, lot_id)
+        # The index is only updated once the transaction has been committed
+        active_sessions.add(parking)
+        return parking
 
     @staticmethod
     async def complete_parking(uow: UnitOfWork, license_plate: str) -> Parking:
@@ -77,55 +63,333 @@ class ParkingService:
             HTTPException: If the car or active parking session is not found, or if the user balance is not positive.
         """
         async with uow:
-            car = await uow.cars.find_one_or_none(license_plate=license_plate)
-            if car is None:
-                raise HTTPException(status_code=404, detail="Car not found")
-
-            await guard.blacklisted(uow, car.id)
-
-            parking = await uow.parkings.find_one_or_none(car_id=car.id, is_active=True)
-            if parking is None:
-                raise HTTPException(status_code=404, detail="No active parking found for this car")
-
-            user = await uow.users.find_one(id=car.owner_id)
-            if user is None:
-                raise HTTPException(status_code=404, detail="Owner of the car not found")
-            guard.positive_balance(user)
-            if parking.end_time is None:
-                parking.end_time = datetime.utcnow()
-
-            parking.is_active = False
-
-            await uow.commit()
-            await uow.session.refresh(parking)
-
-            await PaymentsService.process_payment(uow, parking.id)
-            return ParkingResponse(
-                id=parking.id,
-                car_id=parking.car_id,
-                license_plate=license_plate,
-                is_active=parking.is_active,
-                start_time=parking.start_time,
-                end_time=parking.end_time
+            parking = await ParkingService._complete(uow, license_plate)
+        active_sessions.remove(parking.car_id)
+        return parking
+
+    @staticmethod
+    async def start_parkings(
+            uow: UnitOfWork, license_plates: list[str], lot_id: int | None = None
+    ) -> list[ParkingBatchResult]:
+        """
+        Starts parking sessions for all given license plates in one transaction.
+
+        Each plate is processed in its own savepoint, so a plate that cannot be parked
+        does not prevent the other cars from being parked.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            license_plates (list[str]): The license plates recognized on one frame.
+            lot_id (int | None): The parking lot the cars enter.
+
+        Returns:
+            list[ParkingBatchResult]: The result for every license plate.
+        """
+        async with uow:
+            results = [
+                await ParkingService._apply_in_savepoint(uow, license_plate, partial(ParkingService._start, lot_id=lot_id))
+                for license_plate in license_plates
+            ]
+        for result in results:
+            if result.parking is not None:
+                active_sessions.add(result.parking)
+        return results
+
+    @staticmethod
+    async def complete_parkings(uow: UnitOfWork, license_plates: list[str]) -> list[ParkingBatchResult]:
+        """
+        Completes parking sessions for all given license plates in one transaction.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            license_plates (list[str]): The license plates recognized on one frame.
+
+        Returns:
+            list[ParkingBatchResult]: The result for every license plate.
+        """
+        async with uow:
+            results = [
+                await ParkingService._apply_in_savepoint(uow, license_plate, ParkingService._complete)
+                for license_plate in license_plates
+            ]
+        for result in results:
+            if result.parking is not None:
+                active_sessions.remove(result.parking.car_id)
+        return results
+
+    @staticmethod
+    async def apply_events(uow: UnitOfWork, events: list[ParkingEvent]) -> list[ParkingBatchResult]:
+        """
+        Replays recorded entries and exits, for example after a network outage, in one transaction.
+
+        The events are applied in timestamp order. All cars are resolved and locked in one query,
+        then the new sessions are inserted, the open sessions are closed and all completed sessions
+        are billed with batched statements. Replayed events record cars that have already passed the
+        gate, so the lot capacity and the credit limit are not enforced.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            events (list[ParkingEvent]): The recorded gate events.
+
+        Returns:
+            list[ParkingBatchResult]: The result for every event, in the given order, with the session it
+            started or completed in its state after the whole batch.
+        """
+        results = [
+            ParkingBatchResult(license_plate=event.license_plate, detail="Car not found") for event in events
+        ]
+        async with uow:
+            cars = {
+                car.license_plate: car
+                for car in await uow.parkings.lock_states_by_plates(list({event.license_plate for event in events}))
+            }
+            lot_ids = await uow.parking_lots.find_existing_ids({event.lot_id for event in events if event.lot_id})
+
+            # The open session of every car while the events are replayed, starting from the stored ones
+            open_sessions = {
+                car.car_id: {"car_id": car.car_id, "start_time": car.parked_since, "end_time": None, "stored": True}
+                for car in cars.values() if car.parked_since is not None
+            }
+            new_sessions, closed_sessions, event_sessions = [], [], {}
+            for index, event in sorted(enumerate(events), key=lambda item: item[1].timestamp):
+                car = cars.get(event.license_plate)
+                if car is None:
+                    continue
+                if car.is_blacklisted:
+                    results[index].detail = "Your car is blacklisted. Please contact the administrator."
+                    continue
+                timestamp = event.timestamp
+                if timestamp.tzinfo is not None:
+                    timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+                session = open_sessions.get(car.car_id)
+                if event.event_type == ParkingEventType.ENTRY:
+                    if session is not None:
+                        results[index].detail = "This car is already parked."
+                    elif event.lot_id is not None and event.lot_id not in lot_ids:
+                        results[index].detail = "Parking lot not found"
+                    else:
+                        session = {
+                            "car_id": car.car_id, "lot_id": event.lot_id, "start_time": timestamp, "end_time": None,
+                            "stored": False,
+                        }
+                        open_sessions[car.car_id] = event_sessions[index] = session
+                        new_sessions.append(session)
+                elif session is None:
+                    results[index].detail = "No active parking found for this car"
+                elif timestamp < session["start_time"]:
+                    results[index].detail = "The exit is earlier than the entry."
+                else:
+                    session["end_time"] = timestamp
+                    del open_sessions[car.car_id]
+                    event_sessions[index] = session
+                    if session["stored"]:
+                        closed_sessions.append(session)
+
+            if closed_sessions:
+                closed = {
+                    parking.car_id: parking
+                    for parking in await uow.parkings.close_many(
+                        [(session["car_id"], session["start_time"], session["end_time"]) for session in closed_sessions]
+                    )
+                }
+                for session in closed_sessions:
+                    parking = closed.get(session["car_id"])
+                    if parking is not None:
+                        session.update(id=parking.id, lot_id=parking.lot_id)
+            if new_sessions:
+                parking_ids = await uow.parkings.add_many([
+                    {
+                        "car_id": session["car_id"],
+                        "lot_id": session["lot_id"],
+                        "start_time": session["start_time"],
+                        "end_time": session["end_time"],
+                        "is_active": session["end_time"] is None,
+                    }
+                    for session in new_sessions
+                ])
+                for session, parking_id in zip(new_sessions, parking_ids):
+                    session["id"] = parking_id
+
+            touched_car_ids = {session["car_id"] for session in new_sessions + closed_sessions}
+            if touched_car_ids:
+                await uow.cars.set_parked_since({
+                    car_id: open_sessions[car_id]["start_time"] if car_id in open_sessions else None
+                    for car_id in touched_car_ids
+                })
+
+            plates = {car.car_id: car.license_plate for car in cars.values()}
+            lot_deltas, bills = {}, []
+            for session in new_sessions + closed_sessions:
+                if "id" not in session:
+                    continue
+                session["parking"] = ParkingResponse(
+                    id=session["id"],
+                    car_id=session["car_id"],
+                    license_plate=plates[session["car_id"]],
+                    lot_id=session["lot_id"],
+                    is_active=session["end_time"] is None,
+                    start_time=session["start_time"],
+                    end_time=session["end_time"],
+                )
+                if session["lot_id"] is not None and session["stored"] != (session["end_time"] is None):
+                    # New sessions still open take a place, stored sessions now closed free one
+                    lot_deltas[session["lot_id"]] = lot_deltas.get(session["lot_id"], 0) + (-1 if session["stored"] else 1)
+                if session["end_time"] is not None:
+                    car = cars[plates[session["car_id"]]]
+                    bills.append((session["parking"], car.owner_id, car.hourly_rate, car.tariff))
+
+            lot_deltas = {lot_id: delta for lot_id, delta in lot_deltas.items() if delta}
+            if lot_deltas:
+                await uow.parking_lots.adjust_occupied(lot_deltas)
+            await PaymentsService.bill_parkings(uow, bills)
+
+        for index, session in event_sessions.items():
+            if "parking" in session:
+                results[index] = ParkingBatchResult(license_plate=events[index].license_plate, parking=session["parking"])
+            else:
+                results[index].detail = "No active parking found for this car"
+        # The index is only updated once the transaction has been committed
+        for car_id in touched_car_ids:
+            active_sessions.remove(car_id)
+            if car_id in open_sessions and "parking" in open_sessions[car_id]:
+                active_sessions.add(open_sessions[car_id]["parking"])
+        return results
+
+    @staticmethod
+    async def _apply_in_savepoint(uow: UnitOfWork, license_plate: str, operation) -> ParkingBatchResult:
+        # Leaving the savepoint with an exception rolls it back, so the other plates are kept
+        try:
+            async with uow.session.begin_nested():
+                parking = await operation(uow, license_plate)
+            return ParkingBatchResult(license_plate=license_plate, parking=parking)
+        except HTTPException as e:
+            return ParkingBatchResult(license_plate=license_plate, detail=e.detail)
+        except SQLAlchemyError as e:
+            logging.error(f"Error processing license plate {license_plate}: {e}")
+            return ParkingBatchResult(license_plate=license_plate, detail="Database error while processing this car")
+
+    @staticmethod
+    async def _start(uow: UnitOfWork, license_plate: str, lot_id: int | None = None) -> ParkingResponse:
+        # Car and blacklist status are resolved in one query
+        entry_state = await uow.parkings.find_entry_state(license_plate)
+        if entry_state is None:
+            raise HTTPException(status_code=404, detail="Car not found")
+        if entry_state.is_blacklisted:
+            raise HTTPException(
+                status_code=403,
+                detail="Your car is blacklisted. Please contact the administrator."
+            )
+        # guard.positive_balance(current_user, settings.PARKING_HOURLY_RATE)
+        # The place is taken before the session is inserted, so an unknown lot is refused instead of
+        # failing the foreign key, and the locked lot row cannot disappear before the insert
+        if lot_id is not None and await uow.parking_lots.occupy(lot_id) is None:
+            if await uow.parking_lots.find_one_or_none(id=lot_id) is None:
+                raise HTTPException(status_code=404, detail="Parking lot not found")
+            raise HTTPException(status_code=409, detail="The parking lot is full.")
+
+        start_time = datetime.utcnow()
+        parking_id = await uow.parkings.add_active(entry_state.car_id, start_time, lot_id)
+        if parking_id is None:
+            raise HTTPException(status_code=400, detail="This car is already parked.")
+
+        return ParkingResponse(
+            id=parking_id,
+            car_id=entry_state.car_id,
+            license_plate=license_plate,
+            lot_id=lot_id,
+            is_active=True,
+            start_time=start_time,
+            end_time=None
+        )
+
+    @staticmethod
+    async def _complete(uow: UnitOfWork, license_plate: str) -> ParkingResponse:
+        # Car, owner, rate and blacklist status are resolved in one query
+        exit_state = await uow.parkings.find_exit_state(license_plate)
+        if exit_state is None:
+            raise HTTPException(status_code=404, detail="Car not found")
+
+        if exit_state.is_blacklisted:
+            raise HTTPException(
+                status_code=403,
+                detail="Your car is blacklisted. Please contact the administrator."
             )
-            
+
+        parking = await uow.parkings.close_active(exit_state.car_id, datetime.utcnow())
+        if parking is None:
+            raise HTTPException(status_code=404, detail="No active parking found for this car")
+
+        # An insufficient balance rolls back the closing of the session together with the whole transaction
+        await PaymentsService.bill_parking(
+            uow, parking, exit_state.owner_id, exit_state.hourly_rate, check_credit_limit=True, tariff=exit_state.tariff
+        )
+        if parking.lot_id is not None:
+            await uow.parking_lots.release(parking.lot_id)
+
+        return ParkingResponse(
+            id=parking.id,
+            car_id=parking.car_id,
+            license_plate=license_plate,
+            lot_id=parking.lot_id,
+            is_active=False,
+            start_time=parking.start_time,
+            end_time=parking.end_time
+        )
+
+    @staticmethod
+    async def get_usage_summary(
+            uow: UnitOfWork,
+            group_by: SummaryGrouping,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+    ) -> list[UsageSummary]:
+        """
+        Retrieves session counts and parked hours of closed parkings aggregated in the database.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            group_by (SummaryGrouping): Whether to group by day, week, month, rate or car.
+            date_from (datetime | None): Only parkings started at or after this time.
+            date_to (datetime | None): Only parkings started before this time.
+
+        Returns:
+            list[UsageSummary]: One summary per group, ordered by the grouping key.
+        """
+        async with uow:
+            rows = await uow.parkings.summarize_usage(group_by, date_from, date_to)
+            return [UsageSummary(**row._mapping) for row in rows]
+
     @staticmethod
-    async def get_parkings(uow: UnitOfWork, period: ParkingPeriod, active_only: bool = False) -> list[Parking]:
+    async def get_parkings(
+            uow: UnitOfWork, period: ParkingPeriod, page: PageParams, active_only: bool = False
+    ) -> Page[ParkingResponse]:
         """
-        Retrieves parking records for a specified period.
+        Retrieves one page of parking records for a specified period.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             period (ParkingPeriod): The period for which to retrieve parkings.
+            page (PageParams): The cursor and size of the requested page.
             active_only (bool): If True, only returns active parkings.
 
         Returns:
-            list[ParkingResponse]: A list of parking responses for the specified period.
+            Page[ParkingResponse]: A page of parking responses for the specified period.
         """
+        if period == ParkingPeriod.ALL and active_only:
+            parkings = sorted(
+                (parking for parking in active_sessions.all()
+                 if page.after_id is None or parking.id > page.after_id),
+                key=lambda parking: parking.id,
+            )
+            next_id = parkings[page.limit - 1].id if len(parkings) > page.limit else None
+            return make_page(parkings[:page.limit], next_id)
+
         async with uow:
             # Отримання списку паркінгів за вказаний період
             if period == ParkingPeriod.ALL:
-                parkings = await uow.parkings.find_all_parkings(active_only=active_only)
+                parkings, next_id = await uow.parkings.find_all_parkings(
+                    active_only=active_only, after_id=page.after_id, limit=page.limit
+                )
             else:
                 start_date = datetime.now()
                 if period == ParkingPeriod.WEEK:
@@ -135,31 +399,49 @@ class ParkingService:
                 elif period == ParkingPeriod.YEAR:
                     start_date -= timedelta(days=365)
 
-                parkings = await uow.parkings.find_by_period(start_date, active_only=active_only)
+                parkings, next_id = await uow.parkings.find_by_period(
+                    start_date, active_only=active_only, after_id=page.after_id, limit=page.limit
+                )
+
+            return make_page([ParkingResponse.model_validate(parking) for parking in parkings], next_id)
+
+    @staticmethod
+    def get_occupancy() -> OccupancyResponse:
+        """
+        Returns the current number of active parking sessions from the active-session index.
 
-            return list(parkings)
+        Returns:
+            OccupancyResponse: The number of occupied places and the time of the last reconciliation.
+        """
+        return OccupancyResponse(
+            occupied=active_sessions.occupancy,
+            reconciled_at=active_sessions.reconciled_at,
+        )
 
-    async def get_parkings_by_owner_id(self, uow: UnitOfWork, owner_id: int) -> dict[str, list[ParkingLiteResponse]]:
+    async def get_parkings_by_owner_id(
+            self, uow: UnitOfWork, owner_id: int, include_archived: bool = False
+    ) -> dict[str, list[ParkingLiteResponse]]:
         """
         Retrieves all parking records for a specific car owner, grouped by car license plate.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             owner_id (int): The ID of the car owner.
+            include_archived (bool): Whether to include parkings moved to the cold archive.
 
         Returns:
             dict[str, list[ParkingResponse]]: A dictionary where keys are license plates and values are lists of parking responses.
         """
         async with uow:
             parkings_by_owner = {}
-            cars = await uow.cars.find_by_owner_id(owner_id)
-            for car in cars:
-                parkings = await uow.parkings.find_by_car_id(car.id)
-                parkings_by_owner[car.license_plate] = list(parkings)
-            # parkings = await uow.parkings.find_all(owner_id=owner_id)
+            if include_archived:
+                # Archived parkings are older than any stored one, so they go first
+                plates = {car.id: car.license_plate for car in await uow.cars.find_by_owner_id(owner_id)}
+                for parking in await cold_archive.find_by_car_ids("parkings", list(plates)):
+                    parkings_by_owner.setdefault(plates[parking["car_id"]], []).append(parking)
+            # All cars and their parkings are fetched in one query and grouped in one pass
+            for license_plate, parking in await uow.parkings.find_by_owner_id(owner_id):
+                parkings = parkings_by_owner.setdefault(license_plate, [])
+                if parking is not None:
+                    parkings.append(parking)
             return parkings_by_owner
-
-    # async def get_parkings_by_owner_id(self, uow: UnitOfWork, owner_id: int) -> list[Parking]:
-    #     async with uow:
-    #         parkings = await uow.parkings.find_by_owner_id(owner_id)
-    #         return parkings
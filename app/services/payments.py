@@ -3,12 +3,18 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.core.config import settings
+from app.db.archive import cold_archive
+from app.services.tariffs import tariff_cache
 from app.models import Parking, Car
 from app.models.payments import Payment
 from app.schemas.payment import PaymentSchemaAdd, PaymentResponse, PaymentSchema, PaymentPeriod
 from app.utils.dependencies import UnitOfWork
 from app.models.payments import TransactionType
+from app.schemas.pagination import Page
+from app.schemas.reports import RevenueSummary, SummaryGrouping
 from app.utils.guard import guard
+from app.utils.pagination import PageParams, make_page
 
 
 class PaymentsService:
@@ -27,10 +33,34 @@ class PaymentsService:
             float | None: The calculated cost or None if the end time is not set.
         """
         if parking.end_time:
-            duration_hours = math.ceil((parking.end_time - parking.start_time).total_seconds() / 3600)
-            return duration_hours * parking.car.rate.hourly_rate
+            rate = parking.car.rate
+            return PaymentsService.calculate_amount(parking.start_time, parking.end_time, rate.hourly_rate, rate.tariff)
         return None
 
+    @staticmethod
+    def calculate_amount(
+            start_time: datetime, end_time: datetime, hourly_rate: float, tariff: dict | None = None
+    ) -> float:
+        """
+        Calculates the cost of a parking period.
+
+        With a tariff, the period is priced from the tariff's compiled price table; otherwise every
+        started hour is charged at the hourly rate.
+
+        Args:
+            start_time (datetime): The start of the parking.
+            end_time (datetime): The end of the parking.
+            hourly_rate (float): The hourly rate of the car.
+            tariff (dict | None): The tariff of the car's rate, if it has one.
+
+        Returns:
+            float: The calculated cost.
+        """
+        if tariff is not None:
+            return tariff_cache.get(tariff).price(start_time, end_time)
+        duration_hours = math.ceil((end_time - start_time).total_seconds() / 3600)
+        return duration_hours * hourly_rate
+
     @staticmethod
     async def process_payment(uow: UnitOfWork, parking_id: int) -> int:
         """
@@ -47,54 +77,153 @@ class PaymentsService:
             HTTPException: If the car or user is not found, or if there is an error during payment processing.
         """
         async with (uow):
-            parking = await uow.parkings.find_one_or_none(id=parking_id)
+            parking = await uow.parkings.lock_by_id(parking_id)
+            if parking is None:
+                raise HTTPException(status_code=404, detail="Parking not found")
 
             car = await uow.cars.find_one_or_none(id=parking.car_id)
             if not car:
                 raise HTTPException(status_code=404, detail="Car not found")
-            user = await uow.users.find_one(id=parking.car.owner_id)
-            if not user:
-                raise HTTPException(status_code=404, detail="Owner not found")
-
-            cost = await PaymentsService.calculate_cost(parking)
-            if cost is None:
+            if parking.end_time is None:
                 raise HTTPException(status_code=400, detail="Parking duration is not valid")
-            user.balance -= cost
-            payment = Payment(
-                car_id=parking.car_id,
-                parking_id=parking.id,
-                amount=cost,
-                payment_date=datetime.now(),
-                description=f'Parking fee for {parking.start_time.strftime("%Y-%m-%d %H:%M:%S")} - {parking.end_time.strftime("%Y-%m-%d %H:%M:%S")}',
-
-            )
 
             try:
-                uow.session.add(payment)
-                uow.session.add(user)
+                payment_id = await PaymentsService.bill_parking(
+                    uow, parking, car.owner_id, car.rate.hourly_rate, tariff=car.rate.tariff
+                )
+                if payment_id is None:
+                    raise HTTPException(status_code=400, detail="Parking is already paid")
                 await uow.commit()
-                return payment.id
+                return payment_id
 
             except SQLAlchemyError as e:
                 await uow.rollback()
                 raise HTTPException(status_code=500, detail=f"An error occurred while processing the payment: {str(e)}")
 
     @staticmethod
-    async def get_all_payments(uow: UnitOfWork, period: PaymentPeriod) -> list[PaymentResponse]:
+    def parking_payment(
+            parking, hourly_rate: float, max_hours: float | None = None, tariff: dict | None = None
+    ) -> dict:
+        """
+        Builds the payment of a closed parking session.
+
+        Args:
+            parking: The closed parking session, with `id`, `car_id`, `start_time` and `end_time`.
+            hourly_rate (float): The hourly rate of the car.
+            max_hours (float | None): If set, the charge is capped at the price of this many hours.
+            tariff (dict | None): The tariff of the car's rate, if it has one.
+
+        Returns:
+            dict: The payment details, ready to be inserted.
+        """
+        amount = PaymentsService.calculate_amount(parking.start_time, parking.end_time, hourly_rate, tariff)
+        if max_hours is not None:
+            # The cap is the price of the first `max_hours` of the session, under the same pricing
+            capped_end = parking.start_time + timedelta(hours=max_hours)
+            amount = min(amount, PaymentsService.calculate_amount(parking.start_time, capped_end, hourly_rate, tariff))
+        return {
+            "car_id": parking.car_id,
+            "parking_id": parking.id,
+            "amount": amount,
+            "payment_date": datetime.now(),
+            "description": f'Parking fee for {parking.start_time.strftime("%Y-%m-%d %H:%M:%S")} - {parking.end_time.strftime("%Y-%m-%d %H:%M:%S")}',
+        }
+
+    @staticmethod
+    async def bill_parking(
+            uow: UnitOfWork,
+            parking,
+            owner_id: int,
+            hourly_rate: float,
+            check_credit_limit: bool = False,
+            tariff: dict | None = None,
+    ) -> int | None:
         """
-        Retrieves all payments for a specified period.
+        Bills a closed parking session within the current transaction.
+
+        The payment insert and the balance debit are not committed, so the caller controls the
+        transaction boundary. The session is claimed with its `billed` flag first, which makes billing
+        exactly-once: a session that is already billed is not charged again.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance with an open transaction.
+            parking: The closed parking session, with `id`, `car_id`, `start_time` and `end_time`.
+            owner_id (int): The ID of the owner of the car.
+            hourly_rate (float): The hourly rate of the car.
+            check_credit_limit (bool): Whether to refuse the debit when the owner's balance is at the credit limit.
+            tariff (dict | None): The tariff of the car's rate, if it has one.
+
+        Returns:
+            int | None: The ID of the created payment, or None if the session was already billed.
+
+        Raises:
+            HTTPException: If the credit limit is checked and the owner's balance is insufficient.
+        """
+        if not await uow.parkings.claim_billing([parking]):
+            return None
+        payment = PaymentsService.parking_payment(parking, hourly_rate, tariff=tariff)
+        payment_id, = await uow.payments.add_many([payment])
+        # The credit-limit check and the debit are one atomic statement
+        min_balance = -settings.CREDIT_LIMIT if check_credit_limit else None
+        if await uow.users.change_balance(owner_id, -payment["amount"], min_balance=min_balance) is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient balance to complete the parking."
+            )
+        return payment_id
+
+    @staticmethod
+    async def bill_parkings(
+            uow: UnitOfWork, bills: list[tuple], max_hours: float | None = None
+    ) -> list[int]:
+        """
+        Bills several closed parking sessions with batched statements within the current transaction.
+
+        Sessions that are already billed are skipped. The credit limit is not checked, because the
+        sessions are already over.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance with an open transaction.
+            bills (list[tuple]): The closed parking session, the ID of the car owner, and the hourly rate
+                and tariff of the car for every session to bill.
+            max_hours (float | None): If set, every charge is capped at the price of this many hours.
+
+        Returns:
+            list[int]: The IDs of the created payments, in the given order of the sessions that were billed.
+        """
+        if not bills:
+            return []
+        claimed = await uow.parkings.claim_billing([parking for parking, *_ in bills])
+        payments, balance_deltas = [], {}
+        for parking, owner_id, hourly_rate, tariff in bills:
+            if parking.id not in claimed:
+                continue
+            payment = PaymentsService.parking_payment(parking, hourly_rate, max_hours, tariff)
+            payments.append(payment)
+            balance_deltas[owner_id] = balance_deltas.get(owner_id, 0) - payment["amount"]
+        if not payments:
+            return []
+        payment_ids = await uow.payments.add_many(payments)
+        await uow.users.change_balances(balance_deltas)
+        return payment_ids
+
+    @staticmethod
+    async def get_all_payments(uow: UnitOfWork, period: PaymentPeriod, page: PageParams) -> Page[PaymentResponse]:
+        """
+        Retrieves one page of payments for a specified period.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             period (PaymentPeriod): The period for which to retrieve payments.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list[PaymentResponse]: A list of payments for the specified period.
+            Page[PaymentResponse]: A page of payments for the specified period.
         """
         async with uow:
             # Отримання списку платежів за вказаний період
             if period == PaymentPeriod.ALL:
-                payments = await uow.payments.find_all()
+                payments, next_id = await uow.payments.find_page(page.after_id, page.limit)
             else:
                 start_date = datetime.now()
                 if period == PaymentPeriod.WEEK:
@@ -104,10 +233,33 @@ class PaymentsService:
                 elif period == PaymentPeriod.YEAR:
                     start_date -= timedelta(days=365)
 
-                payments = await uow.payments.find_by_period(start_date)
+                payments, next_id = await uow.payments.find_by_period(start_date, page.after_id, page.limit)
+
+            # Повернення сторінки PaymentResponse
+            return make_page([PaymentResponse.model_validate(payment) for payment in payments], next_id)
+
+    @staticmethod
+    async def get_revenue_summary(
+            uow: UnitOfWork,
+            group_by: SummaryGrouping,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+    ) -> list[RevenueSummary]:
+        """
+        Retrieves payment totals, counts and averages aggregated in the database.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            group_by (SummaryGrouping): Whether to group by day, week, month, rate or car.
+            date_from (datetime | None): Only payments made at or after this time.
+            date_to (datetime | None): Only payments made before this time.
 
-            # Повернення списку PaymentResponse
-            return list(payments)
+        Returns:
+            list[RevenueSummary]: One summary per group, ordered by the grouping key.
+        """
+        async with uow:
+            rows = await uow.payments.summarize_revenue(group_by, date_from, date_to)
+            return [RevenueSummary(**row._mapping) for row in rows]
 
     @staticmethod
     async def get_payment_by_id(uow: UnitOfWork, payment_id: int) -> PaymentResponse:
@@ -134,40 +286,57 @@ class PaymentsService:
             return payment
 
     @staticmethod
-    async def get_payments_by_license_plate(uow: UnitOfWork, license_plate: str) -> list[PaymentResponse]:
+    async def get_payments_by_license_plate(
+            uow: UnitOfWork, license_plate: str, include_archived: bool = False
+    ) -> list[PaymentResponse]:
         """
         Retrieves payments for a specific car license plate.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             license_plate (str): The license plate of the car.
+            include_archived (bool): Whether to include payments moved to the cold archive.
 
         Returns:
             list[PaymentResponse]: A list of payments associated with the specified license plate.
         """
         async with uow:
             payments = await uow.payments.find_by_license_plate(license_plate)
+            if include_archived:
+                car = await uow.cars.find_one_or_none(license_plate=license_plate)
+                if car:
+                    # Archived payments are older than any stored one, so they go first
+                    payments = [*await cold_archive.find_by_car_ids("payments", [car.id]), *payments]
 
             return payments
 
     @staticmethod
-    async def get_my_payments(uow: UnitOfWork, user_id: int) -> dict[str, list[PaymentResponse]]:
+    async def get_my_payments(
+            uow: UnitOfWork, user_id: int, include_archived: bool = False
+    ) -> dict[str, list[PaymentResponse]]:
         """
         Retrieves all payments made by the user, grouped by car license plate.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             user_id (int): The ID of the user whose payments to retrieve.
+            include_archived (bool): Whether to include payments moved to the cold archive.
 
         Returns:
             dict[str, list[PaymentResponse]]: A dictionary where keys are license plates and values are lists of payments.
         """
         async with uow:
             payments_by_car_id = {}
-            cars = await uow.cars.find_by_owner_id(user_id)
-            for car in cars:
-                payments = await uow.payments.find_by_car_id(car.id)
-                payments_by_car_id[car.license_plate] = list(payments)
+            if include_archived:
+                # Archived payments are older than any stored one, so they go first
+                plates = {car.id: car.license_plate for car in await uow.cars.find_by_owner_id(user_id)}
+                for payment in await cold_archive.find_by_car_ids("payments", list(plates)):
+                    payments_by_car_id.setdefault(plates[payment["car_id"]], []).append(payment)
+            # All cars and their payments are fetched in one query and grouped in one pass
+            for license_plate, payment in await uow.payments.find_by_owner_id(user_id):
+                payments = payments_by_car_id.setdefault(license_plate, [])
+                if payment is not None:
+                    payments.append(payment)
 
             return payments_by_car_id
 
@@ -1,6 +1,12 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
 from fastapi import HTTPException, status
 from app.utils.unitofwork import UnitOfWork
-from app.schemas.rates import RateResponse, RateSchemaBase, RateSchemaUpdate
+from app.schemas.rates import RateResponse, RateSchemaBase, RateSchemaUpdate, TariffSimulationRequest, \
+    TariffSimulationResponse
+from app.services.tariff_simulation import BillableSessions, simulate_tariff
 
 
 class RatesService:
@@ -121,4 +127,58 @@ class RatesService:
             await uow.rates.delete_one(id=rate_id)
             return rate
 
+    async def simulate_tariff(self, uow: UnitOfWork, simulation: TariffSimulationRequest) -> TariffSimulationResponse:
+        """
+        Estimates the revenue impact of candidate hourly rates on the closed sessions of a period.
+
+        The billable hours, rate and owner of all sessions are loaded into NumPy arrays, and the costs
+        under the current and the candidate rates are computed in one vectorized pass. Nothing is changed.
+        Rates priced by a tariff are not billed by the hour, so their sessions are excluded and the
+        rates are listed in the response.
+
+        Args:
+            uow (UnitOfWork): The unit of work instance for database transactions.
+            simulation (TariffSimulationRequest): The candidate hourly rates and the period to re-bill,
+                by default the previous calendar month.
+
+        Returns:
+            TariffSimulationResponse: The current and simulated revenue in total, per rate and for the most affected users.
 
+        Raises:
+            HTTPException: If a candidate rate ID does not exist or is priced by a tariff.
+        """
+        month_start = dict(day=1, hour=0, minute=0, second=0, microsecond=0)
+        date_to = simulation.date_to or datetime.utcnow().replace(**month_start)
+        date_from = simulation.date_from or (date_to - timedelta(microseconds=1)).replace(**month_start)
+        async with uow:
+            all_rates = await uow.rates.find_all()
+            rates = {rate.id: (rate.name, rate.hourly_rate) for rate in all_rates if rate.tariff is None}
+            tariffed = {rate.id for rate in all_rates if rate.tariff is not None}
+            unknown = set(simulation.hourly_rates) - set(rates) - tariffed
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail=f"Rates not found: {sorted(unknown)}"
+                )
+            if tariffed & set(simulation.hourly_rates):
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Rates priced by a tariff cannot be simulated: {sorted(tariffed & set(simulation.hourly_rates))}",
+                )
+            chunks = [
+                np.array(rows, dtype=np.int64)
+                async for rows in uow.parkings.stream_billable_hours(date_from, date_to)
+            ]
+
+        sessions = BillableSessions.from_chunks(chunks).without_rates(tariffed)
+        impact = await asyncio.to_thread(simulate_tariff, sessions, rates, simulation.hourly_rates, simulation.top_users)
+        return TariffSimulationResponse(
+            date_from=date_from,
+            date_to=date_to,
+            sessions=len(sessions),
+            current_revenue=impact.current_revenue,
+            simulated_revenue=impact.simulated_revenue,
+            delta=impact.simulated_revenue - impact.current_revenue,
+            by_rate=impact.by_rate,
+            by_user=impact.by_user,
+            excluded_rate_ids=sorted(tariffed),
+        )
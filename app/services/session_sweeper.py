@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.services.active_sessions import active_sessions
+from app.services.payments import PaymentsService
+from app.utils.unitofwork import UnitOfWork
+
+
+class StaleSessionSweeper:
+    """
+    Closes parking sessions that never got an exit event.
+
+    Sessions active for longer than `max_duration_hours` are closed in batches of `batch_size`, each
+    batch with one set-based statement in its own transaction, and billed with the charge capped at
+    `max_charge_hours`. Locked cars are skipped, so the sweeper can run in every worker and never
+    waits for gate traffic.
+    """
+
+    def __init__(
+            self,
+            max_duration_hours: float = settings.SESSION_MAX_DURATION_HOURS,
+            max_charge_hours: float = settings.SESSION_MAX_CHARGE_HOURS,
+            batch_size: int = settings.SESSION_SWEEP_BATCH_SIZE,
+    ):
+        self.max_duration_hours = max_duration_hours
+        self.max_charge_hours = max_charge_hours
+        self.batch_size = batch_size
+
+    async def sweep_batch(self, uow: UnitOfWork, now: datetime) -> int:
+        """
+        Closes and bills one batch of stale sessions.
+
+        Returns:
+            int: The number of sessions closed.
+        """
+        async with uow:
+            parkings = await uow.parkings.close_stale(
+                now - timedelta(hours=self.max_duration_hours), now, self.batch_size
+            )
+            await PaymentsService.bill_parkings(
+                uow,
+                [(parking, parking.owner_id, parking.hourly_rate, parking.tariff) for parking in parkings],
+                self.max_charge_hours,
+            )
+            lot_deltas = {}
+            for parking in parkings:
+                if parking.lot_id is not None:
+                    lot_deltas[parking.lot_id] = lot_deltas.get(parking.lot_id, 0) - 1
+            if lot_deltas:
+                await uow.parking_lots.adjust_occupied(lot_deltas)
+        # The index is only updated once the transaction has been committed
+        for parking in parkings:
+            active_sessions.remove(parking.car_id)
+        return len(parkings)
+
+    async def run(self) -> int:
+        """
+        Closes all stale sessions, batch by batch.
+
+        Returns:
+            int: The number of sessions closed.
+        """
+        now = datetime.utcnow()
+        closed = 0
+        while True:
+            swept = await self.sweep_batch(UnitOfWork(), now)
+            closed += swept
+            if swept < self.batch_size:
+                return closed
+
+    async def run_forever(self, interval: float = settings.SESSION_SWEEP_SECONDS) -> None:
+        """
+        Sweeps stale sessions every `interval` seconds until cancelled.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                closed = await self.run()
+                if closed:
+                    logging.info(f"Closed {closed} stale parking sessions")
+            except Exception as e:
+                logging.error(f"Error closing stale parking sessions: {e}")
+
+
+session_sweeper = StaleSessionSweeper()
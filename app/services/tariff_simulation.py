@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.schemas.rates import RateImpact, UserImpact
+
+
+@dataclass
+class BillableSessions:
+    """
+    Closed parking sessions as parallel arrays: billable hours, rate ID and owner ID of every session.
+    """
+    hours: np.ndarray
+    rate_ids: np.ndarray
+    owner_ids: np.ndarray
+
+    @classmethod
+    def from_chunks(cls, chunks: list[np.ndarray]) -> "BillableSessions":
+        columns = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+        return cls(hours=columns[:, 0], rate_ids=columns[:, 1], owner_ids=columns[:, 2])
+
+    def without_rates(self, rate_ids: set[int]) -> "BillableSessions":
+        kept = ~np.isin(self.rate_ids, list(rate_ids))
+        return BillableSessions(hours=self.hours[kept], rate_ids=self.rate_ids[kept], owner_ids=self.owner_ids[kept])
+
+    def __len__(self) -> int:
+        return len(self.hours)
+
+
+@dataclass
+class TariffImpact:
+    current_revenue: float
+    simulated_revenue: float
+    by_rate: list[RateImpact]
+    by_user: list[UserImpact]
+
+
+def simulate_tariff(
+        sessions: BillableSessions,
+        rates: dict[int, tuple[str, float]],
+        candidate_rates: dict[int, float],
+        top_users: int,
+) -> TariffImpact:
+    """
+    Recomputes the cost of every session under the current and the candidate hourly rates in one pass.
+
+    Args:
+        sessions (BillableSessions): The closed sessions to re-bill.
+        rates (dict[int, tuple[str, float]]): The name and current hourly rate of every rate ID.
+        candidate_rates (dict[int, float]): The candidate hourly rate of the changed rate IDs.
+        top_users (int): How many users with the largest absolute change to report.
+
+    Returns:
+        TariffImpact: The current and simulated revenue in total, per rate and for the most affected users.
+    """
+    rate_ids = np.array(sorted(rates), dtype=np.int64)
+    current_prices = np.array([rates[rate_id][1] for rate_id in rate_ids.tolist()], dtype=np.float64)
+    simulated_prices = np.array(
+        [candidate_rates.get(rate_id, rates[rate_id][1]) for rate_id in rate_ids.tolist()], dtype=np.float64
+    )
+
+    # Every session's rate becomes an index into the price arrays, so costs are plain array products
+    rate_index = np.searchsorted(rate_ids, sessions.rate_ids)
+    current_costs = sessions.hours * current_prices[rate_index]
+    simulated_costs = sessions.hours * simulated_prices[rate_index]
+
+    rates_count = len(rate_ids)
+    sessions_by_rate = np.bincount(rate_index, minlength=rates_count)
+    current_by_rate = np.bincount(rate_index, weights=current_costs, minlength=rates_count)
+    simulated_by_rate = np.bincount(rate_index, weights=simulated_costs, minlength=rates_count)
+    by_rate = [
+        RateImpact(
+            rate_id=rate_id,
+            name=rates[rate_id][0],
+            sessions=int(sessions_by_rate[i]),
+            current_hourly_rate=float(current_prices[i]),
+            simulated_hourly_rate=float(simulated_prices[i]),
+            current_revenue=float(current_by_rate[i]),
+            simulated_revenue=float(simulated_by_rate[i]),
+            delta=float(simulated_by_rate[i] - current_by_rate[i]),
+        )
+        for i, rate_id in enumerate(rate_ids.tolist())
+    ]
+
+    user_ids, user_index = np.unique(sessions.owner_ids, return_inverse=True)
+    sessions_by_user = np.bincount(user_index, minlength=len(user_ids))
+    current_by_user = np.bincount(user_index, weights=current_costs, minlength=len(user_ids))
+    simulated_by_user = np.bincount(user_index, weights=simulated_costs, minlength=len(user_ids))
+    deltas_by_user = simulated_by_user - current_by_user
+    most_affected = np.argsort(-np.abs(deltas_by_user), kind="stable")[:top_users]
+    by_user = [
+        UserImpact(
+            user_id=int(user_ids[i]),
+            sessions=int(sessions_by_user[i]),
+            current_revenue=float(current_by_user[i]),
+            simulated_revenue=float(simulated_by_user[i]),
+            delta=float(deltas_by_user[i]),
+        )
+        for i in most_affected.tolist()
+    ]
+
+    return TariffImpact(
+        current_revenue=float(current_costs.sum()),
+        simulated_revenue=float(simulated_costs.sum()),
+        by_rate=by_rate,
+        by_user=by_user,
+    )
@@ -0,0 +1,115 @@
+import json
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+
+MINUTES_PER_DAY = 24 * 60
+EPOCH = datetime(1970, 1, 1)
+
+
+@dataclass(frozen=True)
+class CompiledTariff:
+    """
+    A tariff compiled into a cumulative price table over one day.
+
+    `band_starts` holds the minute of the day each time-of-day band starts at, and `cumulative` the
+    price of the day up to that minute, so the price from midnight to any minute is one binary search
+    and one multiplication. Days repeat, so the price between any two instants is the difference of
+    two such lookups, whatever the length of the stay.
+    """
+    band_starts: tuple[int, ...]
+    minute_rates: tuple[float, ...]
+    cumulative: tuple[float, ...]
+    day_price: float
+    free_minutes: int
+    daily_cap: float | None
+    utc_offset_minutes: int
+
+    def price_until(self, minute: float) -> float:
+        """
+        Returns the uncapped price from the epoch up to a local minute.
+        """
+        day, minute_of_day = divmod(minute, MINUTES_PER_DAY)
+        band = bisect_right(self.band_starts, minute_of_day) - 1
+        return (
+            day * self.day_price
+            + self.cumulative[band]
+            + (minute_of_day - self.band_starts[band]) * self.minute_rates[band]
+        )
+
+    def price(self, start_time: datetime, end_time: datetime) -> float:
+        """
+        Prices a parking session, charging every started minute after the free minutes.
+
+        The daily cap applies to every 24 hours from the end of the free minutes. A full 24 hours
+        always costs the price of a whole day, so only the last, partial day needs the table.
+
+        Args:
+            start_time (datetime): The start of the parking, in UTC.
+            end_time (datetime): The end of the parking, in UTC.
+
+        Returns:
+            float: The price of the session.
+        """
+        charged_minutes = math.ceil((end_time - start_time).total_seconds() / 60) - self.free_minutes
+        if charged_minutes <= 0:
+            return 0.0
+        start = (start_time - EPOCH).total_seconds() / 60 + self.utc_offset_minutes + self.free_minutes
+        end = start + charged_minutes
+        if self.daily_cap is None:
+            return round(self.price_until(end) - self.price_until(start), 2)
+
+        full_days = charged_minutes // MINUTES_PER_DAY
+        last_day_start = start + full_days * MINUTES_PER_DAY
+        last_day_price = self.price_until(end) - self.price_until(last_day_start)
+        return round(
+            full_days * min(self.day_price, self.daily_cap) + min(last_day_price, self.daily_cap), 2
+        )
+
+
+def compile_tariff(tariff: dict) -> CompiledTariff:
+    """
+    Compiles a tariff into its cumulative price table.
+
+    Args:
+        tariff (dict): The tariff, as described by `app.schemas.rates.Tariff`.
+
+    Returns:
+        CompiledTariff: The compiled tariff.
+    """
+    bands = sorted(tariff["bands"], key=lambda band: band["start_minute"])
+    band_starts = tuple(band["start_minute"] for band in bands)
+    minute_rates = tuple(band["hourly_rate"] / 60 for band in bands)
+    band_ends = band_starts[1:] + (MINUTES_PER_DAY,)
+    cumulative = [0.0]
+    for band_start, band_end, minute_rate in zip(band_starts, band_ends, minute_rates):
+        cumulative.append(cumulative[-1] + (band_end - band_start) * minute_rate)
+    return CompiledTariff(
+        band_starts=band_starts,
+        minute_rates=minute_rates,
+        cumulative=tuple(cumulative[:-1]),
+        day_price=cumulative[-1],
+        free_minutes=tariff.get("free_minutes", 0),
+        daily_cap=tariff.get("daily_cap"),
+        utc_offset_minutes=tariff.get("utc_offset_minutes", 0),
+    )
+
+
+class TariffCache:
+    """
+    Compiled tariffs by their JSON, so every tariff is compiled once however many sessions it prices.
+    """
+
+    def __init__(self):
+        self.compiled: dict[str, CompiledTariff] = {}
+
+    def get(self, tariff: dict) -> CompiledTariff:
+        key = json.dumps(tariff, sort_keys=True)
+        compiled = self.compiled.get(key)
+        if compiled is None:
+            compiled = self.compiled[key] = compile_tariff(tariff)
+        return compiled
+
+
+tariff_cache = TariffCache()
@@ -4,6 +4,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.schemas.transactions import TransactionResponse, TransactionSchemaAdd
 from app.utils.dependencies import UnitOfWork
 from app.repositories.transactions import TransactionRepository
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, make_page
 
 
 class TransactionsService:
@@ -11,25 +13,26 @@ class TransactionsService:
     Service class for handling transaction-related operations.
     """
     @staticmethod
-    async def get_all_transactions(uow: UnitOfWork) -> list[TransactionResponse]:
+    async def get_all_transactions(uow: UnitOfWork, page: PageParams) -> Page[TransactionResponse]:
         """
-        Retrieves all transactions from the database.
+        Retrieves one page of transactions from the database.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list[TransactionResponse]: A list of all transactions.
+            Page[TransactionResponse]: A page of transactions.
 
         Raises:
             HTTPException: If no transactions are found.
         """
         async with (uow):
-            transactions = await uow.transactions.find_all()
-            if not transactions:
+            transactions, next_id = await uow.transactions.find_page(page.after_id, page.limit)
+            if not transactions and page.after_id is None:
                 raise HTTPException(status_code=404, detail="Transactions not found")
 
-            return transactions
+            return make_page([TransactionResponse.model_validate(transaction) for transaction in transactions], next_id)
 
     @staticmethod
     async def get_transaction_by_id(uow: UnitOfWork, transaction_id: int) -> TransactionResponse:
@@ -54,21 +57,26 @@ class TransactionsService:
             return transaction
 
     @staticmethod
-    async def get_transactions_by_user_id(uow: UnitOfWork, user_id: int) -> list[TransactionResponse]:
+    async def get_transactions_by_user_id(
+            uow: UnitOfWork, user_id: int, page: PageParams
+    ) -> Page[TransactionResponse]:
         """
-        Retrieves all transactions for a specific user.
+        Retrieves one page of transactions for a specific user.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
             user_id (int): The ID of the user whose transactions are to be retrieved.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list[TransactionResponse]: A list of transactions for the specified user.
+            Page[TransactionResponse]: A page of transactions for the specified user.
         """
         async with uow:
-            transactions = await uow.transactions.find_by_user_id(user_id=user_id)
+            transactions, next_id = await uow.transactions.find_by_user_id(
+                user_id=user_id, after_id=page.after_id, limit=page.limit
+            )
 
-            return transactions
+            return make_page([TransactionResponse.model_validate(transaction) for transaction in transactions], next_id)
 
 
     @staticmethod
@@ -88,24 +96,18 @@ class TransactionsService:
             HTTPException: If the user is not found, or if there is an error during the transaction creation.
         """
         async with uow:
-            user = await uow.users.find_one_or_none(id=user_id)
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
             try:
+                # The balance is incremented in the database, so concurrent top-ups cannot lose updates
+                if await uow.users.change_balance(user_id, amount) is None:
+                    raise HTTPException(status_code=404, detail="User not found")
+
                 transaction_data = {
                     "amount": amount,
                     "user_id": user_id
                 }
-                
                 transaction_id = await uow.transactions.add_one(transaction_data)
-                user.balance += amount
-                await uow.commit()
-                                
-                transaction = await uow.transactions.find_one_or_none(id=transaction_id)
-                if not transaction:
-                    raise HTTPException(status_code=404, detail="Transaction not found after creation")
-                
-                return TransactionResponse(id=transaction.id, amount=transaction.amount)
+
+                return TransactionResponse(id=transaction_id, amount=amount)
             except SQLAlchemyError as e:
                 await uow.rollback()
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -151,19 +153,11 @@ class TransactionsService:
             transaction = await uow.transactions.find_one_or_none(id=transaction_id)
             if not transaction:
                 raise HTTPException(status_code=404, detail="Transaction not found")
-            user = await uow.users.find_one_or_none(id=transaction.user_id)
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
             try:
-                user.balance -= transaction.amount
-                uow.session.add(user)
-                await uow.commit()
-                await uow.session.refresh(user)
+                if await uow.users.change_balance(transaction.user_id, -transaction.amount) is None:
+                    raise HTTPException(status_code=404, detail="User not found")
                 await uow.transactions.delete_one(id=transaction_id)
                 return transaction
             except SQLAlchemyError as e:
-                uow.session.rollback()
+                await uow.rollback()
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-
-
-
@@ -1,6 +1,9 @@
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import func, select
 from app.schemas.users import UserResponse, UserSchemaAdd, UserSchemaUpdate
+from app.schemas.pagination import Page
+from app.utils.pagination import PageParams, make_page
 from app.utils.unitofwork import UnitOfWork
 
 
@@ -23,7 +26,8 @@ class UsersService:
         Raises:
             HTTPException: If a user with the provided email already exists.
         """
-        user_dict = user.model_dump()
+        # model_dump hashes the password with bcrypt, which is CPU-bound
+        user_dict = await run_in_threadpool(user.model_dump)
         async with uow:
             count = await uow.users.count()
             if count == 0:
@@ -37,20 +41,21 @@ class UsersService:
             user_id = await uow.users.add_one(user_dict)
             return user_id
 
-    async def get_users(self, uow: UnitOfWork):
+    async def get_users(self, uow: UnitOfWork, page: PageParams) -> Page[UserResponse]:
         """
-        Retrieves all users from the database.
+        Retrieves one page of users from the database.
 
         Args:
             uow (UnitOfWork): The unit of work instance for database transactions.
+            page (PageParams): The cursor and size of the requested page.
 
         Returns:
-            list: A list of all users.
+            Page[UserResponse]: A page of users.
 
         """
         async with uow:
-            users = await uow.users.find_all()
-            return users
+            users, next_id = await uow.users.find_page(page.after_id, page.limit)
+            return make_page([UserResponse.model_validate(user) for user in users], next_id)
 
     async def get_user_by_id(self, uow: UnitOfWork, user_id: int) -> UserResponse:
         """
@@ -98,7 +103,7 @@ class UsersService:
                     status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
                 )
 
-            for key, value in user_data.model_dump().items():
+            for key, value in (await run_in_threadpool(user_data.model_dump)).items():
                 setattr(user, key, value)
 
             await uow.commit()
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.core.config import settings
+
+
+@dataclass
+class AdmissionClass:
+    name: str
+    priority: int
+    limit: int
+    max_queue: int
+
+
+class AdmissionController:
+    """
+    Admission control and priority scheduling for CPU-heavy endpoints.
+
+    Every request class has its own concurrency limit and a bounded wait queue, and all classes share
+    `total_slots` worker slots. When a slot frees up, the waiting request with the highest priority
+    (lowest number) is admitted first. A request whose class queue is full is rejected at once with 429,
+    and a request that waits longer than `queue_timeout` seconds gets 503, both with Retry-After.
+    """
+
+    def __init__(
+            self,
+            classes: list[AdmissionClass],
+            total_slots: int = settings.ADMISSION_TOTAL_SLOTS,
+            queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT,
+            retry_after: int = settings.ADMISSION_RETRY_AFTER,
+    ):
+        self.classes = {admission_class.name: admission_class for admission_class in classes}
+        self.total_slots = total_slots
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = {name: 0 for name in self.classes}
+        self.queued = {name: 0 for name in self.classes}
+        self.total_active = 0
+        self.waiters: list[tuple[int, int, str, asyncio.Future]] = []
+        self.sequence = itertools.count()
+
+    def _can_run(self, admission_class: AdmissionClass) -> bool:
+        return self.total_active < self.total_slots and self.active[admission_class.name] < admission_class.limit
+
+    def _has_priority_waiters(self, admission_class: AdmissionClass) -> bool:
+        return any(
+            priority <= admission_class.priority and self.active[name] < self.classes[name].limit
+            for priority, _, name, _ in self.waiters
+        )
+
+    def _grant(self, name: str) -> None:
+        self.active[name] += 1
+        self.total_active += 1
+
+    def _reject(self, status_code: int, detail: str) -> HTTPException:
+        return HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def acquire(self, name: str) -> None:
+        """
+        Waits for a worker slot for a request of the given class.
+
+        Raises:
+            HTTPException: 429 if the class queue is full, 503 if no slot frees up in time.
+        """
+        admission_class = self.classes[name]
+        if self._can_run(admission_class) and not self._has_priority_waiters(admission_class):
+            self._grant(name)
+            return
+
+        if self.queued[name] >= admission_class.max_queue:
+            raise self._reject(status.HTTP_429_TOO_MANY_REQUESTS, "Too many requests, please retry later.")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (admission_class.priority, next(self.sequence), name, future)
+        heapq.heappush(self.waiters, entry)
+        self.queued[name] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # The slot was granted at the moment the wait timed out.
+                return
+            self._remove_waiter(entry)
+            raise self._reject(status.HTTP_503_SERVICE_UNAVAILABLE, "Server is busy, please retry later.")
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(name)
+            else:
+                self._remove_waiter(entry)
+            raise
+
+    def _remove_waiter(self, entry: tuple[int, int, str, asyncio.Future]) -> None:
+        self.waiters.remove(entry)
+        heapq.heapify(self.waiters)
+        self.queued[entry[2]] -= 1
+        entry[3].cancel()
+
+    def release(self, name: str) -> None:
+        """
+        Frees the slot of a finished request and admits the waiting requests in priority order.
+        """
+        self.active[name] -= 1
+        self.total_active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        skipped = []
+        while self.waiters and self.total_active < self.total_slots:
+            entry = heapq.heappop(self.waiters)
+            _, _, name, future = entry
+            if future.done():
+                continue
+            if self.active[name] >= self.classes[name].limit:
+                skipped.append(entry)
+                continue
+            self.queued[name] -= 1
+            self._grant(name)
+            future.set_result(None)
+        for entry in skipped:
+            heapq.heappush(self.waiters, entry)
+
+    def slot(self, name: str):
+        """
+        Returns a FastAPI dependency that holds a slot of the given class for the duration of the request.
+        """
+        async def dependency():
+            await self.acquire(name)
+            try:
+                yield
+            finally:
+                self.release(name)
+
+        return dependency
+
+    async def stream(self, name: str, content: AsyncIterator[bytes], **kwargs) -> StreamingResponse:
+        """
+        Acquires a slot of the given class and holds it until a streamed response body has been sent.
+
+        A `slot` dependency is released as soon as the endpoint returns, before the body of a
+        StreamingResponse is sent, so streaming endpoints take their slot here instead.
+
+        Raises:
+            HTTPException: 429 if the class queue is full, 503 if no slot frees up in time.
+        """
+        await self.acquire(name)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.release(name)
+
+        async def body() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in content:
+                    yield chunk
+            finally:
+                release()
+
+        # The background task also frees the slot if the client disconnects before the body starts
+        return StreamingResponse(body(), background=BackgroundTask(release), **kwargs)
+
+
+admission = AdmissionController(
+    classes=[
+        AdmissionClass("gate", priority=0, limit=settings.ADMISSION_GATE_LIMIT, max_queue=settings.ADMISSION_MAX_QUEUE),
+        AdmissionClass("auth", priority=1, limit=settings.ADMISSION_AUTH_LIMIT, max_queue=settings.ADMISSION_MAX_QUEUE),
+        AdmissionClass("report", priority=2, limit=settings.ADMISSION_REPORT_LIMIT, max_queue=settings.ADMISSION_MAX_QUEUE),
+    ]
+)
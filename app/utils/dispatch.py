@@ -0,0 +1,66 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+
+
+class KeyedLocks:
+    """
+    A set of FIFO locks created on demand per key and dropped when no longer used.
+    """
+
+    def __init__(self):
+        self.locks: dict[str, asyncio.Lock] = {}
+        self.users: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        self.users[key] = self.users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self.users[key] -= 1
+            if not self.users[key]:
+                del self.users[key]
+                del self.locks[key]
+
+
+class GateEventDispatcher:
+    """
+    Orders gate events without a global lock.
+
+    Events from the same gate are handled one at a time in arrival order, and the database work for
+    the same license plate never overlaps, so an exit cannot be processed while its entry is still
+    being committed. Events from different gates and for different plates run fully in parallel.
+    The locks are process-local, so gate traffic must be routed to the same worker per gate.
+    """
+
+    def __init__(self):
+        self.gate_locks = KeyedLocks()
+        self.plate_locks = KeyedLocks()
+
+    @asynccontextmanager
+    async def gate(self, gate_id: str | None):
+        """
+        Serialises the events of one gate. Events without a gate id are not serialised.
+        """
+        if gate_id is None:
+            yield
+            return
+        async with self.gate_locks.hold(gate_id):
+            yield
+
+    @asynccontextmanager
+    async def plates(self, license_plates: list[str]):
+        """
+        Serialises the processing of the given license plates.
+
+        Locks are taken in sorted order, so events holding several plates cannot deadlock.
+        """
+        async with AsyncExitStack() as stack:
+            for license_plate in sorted(set(license_plates)):
+                await stack.enter_async_context(self.plate_locks.hold(license_plate))
+            yield
+
+
+gate_events = GateEventDispatcher()
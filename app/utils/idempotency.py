@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class StoredResponse:
+    # Hash of the query string and body of the request the response belongs to
+    fingerprint: bytes
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+
+
+class IdempotencyStore:
+    """
+    Process-local store of responses by idempotency key, with a TTL and a size cap.
+
+    Entries are kept in insertion order, and since they all live for the same TTL, the oldest entry
+    is always the first to expire. Requests that are still running are tracked as pending, so a retry
+    that arrives before the original finishes waits for it instead of running again.
+    """
+
+    def __init__(self, ttl: float = settings.IDEMPOTENCY_TTL_SECONDS, max_keys: int = settings.IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.responses: OrderedDict[bytes, StoredResponse] = OrderedDict()
+        self.pending: dict[bytes, asyncio.Future] = {}
+
+    def _evict(self, now: float) -> None:
+        while self.responses and next(iter(self.responses.values())).expires_at <= now:
+            self.responses.popitem(last=False)
+        while len(self.responses) > self.max_keys:
+            self.responses.popitem(last=False)
+
+    def get(self, key: bytes) -> StoredResponse | None:
+        self._evict(time.monotonic())
+        return self.responses.get(key)
+
+    def begin(self, key: bytes) -> None:
+        self.pending[key] = asyncio.get_running_loop().create_future()
+
+    def finish(
+            self, key: bytes, fingerprint: bytes = b"", status: int | None = None, headers=None, body: bytes = b""
+    ) -> None:
+        """
+        Stores the response of a finished request, or only releases its waiters if `status` is None.
+        """
+        if status is not None:
+            now = time.monotonic()
+            self.responses[key] = StoredResponse(fingerprint, status, headers, body, now + self.ttl)
+            self.responses.move_to_end(key)
+            self._evict(now)
+        future = self.pending.pop(key)
+        if not future.done():
+            future.set_result(None)
+
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response of a mutation retried with the same `Idempotency-Key` header.
+
+    Keys are scoped by method, path and the Authorization header. The first request with a key runs
+    normally and its response is stored; a retry gets the stored response with an
+    `Idempotent-Replayed: true` header, without reaching the endpoint, so recognition and database
+    work are not repeated. A key reused with a different query string or body is refused with 422
+    instead of replaying a response that belongs to another payload. Server errors and 429 responses
+    are not stored, so those can be retried.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, prefixes: tuple[str, ...]):
+        self.app = app
+        self.store = store
+        self.prefixes = prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get("idempotency-key")
+        if idempotency_key is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            response = JSONResponse({"detail": "Idempotency-Key is too long."}, status_code=400)
+            await response(scope, receive, send)
+            return
+
+        key = hashlib.sha256(
+            "\n".join((scope["method"], scope["path"], headers.get("authorization", ""), idempotency_key)).encode()
+        ).digest()
+        # The body is read up front to fingerprint the payload, then handed to the endpoint unchanged
+        messages = await self.read_body(receive)
+        fingerprint = self.fingerprint(scope, headers, messages)
+        buffered = iter(messages)
+
+        async def replay_receive() -> Message:
+            return next(buffered, None) or await receive()
+
+        while True:
+            stored = self.store.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    response = JSONResponse(
+                        {"detail": "Idempotency-Key was already used with a different request."}, status_code=422
+                    )
+                    await response(scope, receive, send)
+                    return
+                await self.replay(stored, send)
+                return
+            pending = self.store.pending.get(key)
+            if pending is None:
+                break
+            await asyncio.shield(pending)
+
+        self.store.begin(key)
+        response: dict = {"body": []}
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture)
+        except BaseException:
+            self.store.finish(key)
+            raise
+        status = response.get("status")
+        if status is None or status >= 500 or status == 429:
+            self.store.finish(key)
+        else:
+            self.store.finish(key, fingerprint, status, response["headers"], b"".join(response["body"]))
+
+    @staticmethod
+    async def read_body(receive: Receive) -> list[Message]:
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                return messages
+
+    @staticmethod
+    def fingerprint(scope: Scope, headers: Headers, messages: list[Message]) -> bytes:
+        body = b"".join(message.get("body", b"") for message in messages if message["type"] == "http.request")
+        # Multipart boundaries are random per request, so a retried upload would never match with them
+        boundary = headers.get("content-type", "").partition("boundary=")[2].strip('"')
+        if boundary:
+            body = body.replace(boundary.encode(), b"")
+        return hashlib.sha256(scope.get("query_string", b"") + b"\n" + body).digest()
+
+    @staticmethod
+    async def replay(stored: StoredResponse, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": [*stored.headers, (b"idempotent-replayed", b"true")],
+        })
+        await send({"type": "http.response.body", "body": stored.body})
+
+
+idempotency_store = IdempotencyStore()
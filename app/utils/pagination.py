@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Query, status
+
+from app.core.config import settings
+from app.schemas.pagination import Page
+
+MAX_ID = 2 ** 31 - 1
+
+
+def encode_cursor(after_id: int | None) -> str | None:
+    """
+    Encodes the position after the given ID as an opaque cursor.
+    """
+    if after_id is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps({"id": after_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """
+    Decodes a cursor created by `encode_cursor`.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        after_id = data["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError, OverflowError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    # IDs are int4 columns, so anything else would only fail later in the database driver
+    if type(after_id) is not int or not 0 <= after_id <= MAX_ID:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return after_id
+
+
+class PageParams:
+    """
+    Query parameters of a keyset-paginated list endpoint.
+    """
+
+    def __init__(
+            self,
+            cursor: str | None = Query(None, description="Cursor returned as next_cursor by the previous page"),
+            limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size"),
+    ):
+        self.after_id = decode_cursor(cursor)
+        self.limit = limit
+
+
+def make_page(items: list, next_id: int | None) -> Page:
+    return Page(items=items, next_cursor=encode_cursor(next_id))
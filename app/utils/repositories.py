@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 
-from sqlalchemy import RowMapping, delete, insert, select, update, func
+from sqlalchemy import Row, RowMapping, Select, delete, insert, select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+
 
 class AbstractRepository(ABC):
     @abstractmethod
@@ -79,6 +81,66 @@ class SQLAlchemyRepository(AbstractRepository):
         res = await self.session.execute(stmt)
         return res.scalar_one()
 
+    def keyset(self, stmt: Select, after_id: Optional[int] = None, limit: Optional[int] = None) -> Select:
+        """Orders a statement by primary key and restricts it to one keyset page.
+
+        One extra row is requested, so the caller can tell whether another page follows.
+        """
+        stmt = stmt.order_by(self.model.id)
+        if after_id is not None:
+            stmt = stmt.where(self.model.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit + 1)
+        return stmt
+
+    async def fetch_page(
+        self, stmt: Select, after_id: Optional[int] = None, limit: Optional[int] = None, rows: bool = False
+    ) -> tuple[list, Optional[int]]:
+        """Executes a statement as a keyset page.
+
+        With `rows`, the page holds the result rows of a column statement, which must include `id`.
+
+        Returns:
+            tuple[list, Optional[int]]: The objects of the page and the ID to continue after,
+            or None if this is the last page.
+        """
+        res = await self.session.execute(self.keyset(stmt, after_id, limit))
+        items = list(res.all() if rows else res.scalars().all())
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            return items, items[-1].id
+        return items, None
+
+    async def find_page(
+        self, after_id: Optional[int] = None, limit: Optional[int] = None, **filter_by
+    ) -> tuple[list, Optional[int]]:
+        return await self.fetch_page(select(self.model).filter_by(**filter_by), after_id, limit)
+
+    async def stream(
+        self, stmt: Optional[Select] = None, fetch_size: int = settings.STREAM_FETCH_SIZE, **filter_by
+    ) -> AsyncIterator:
+        """Yields the model objects of a statement through a server-side cursor.
+
+        Rows are fetched `fetch_size` at a time, so memory use does not grow with the table size.
+        Without a statement, all objects matching `filter_by` are streamed in primary key order.
+        """
+        if stmt is None:
+            stmt = select(self.model).filter_by(**filter_by).order_by(self.model.id)
+        result = await self.session.stream_scalars(stmt.execution_options(yield_per=fetch_size))
+        async for obj in result:
+            yield obj
+
+    async def stream_rows(
+        self, stmt: Select, fetch_size: int = settings.STREAM_FETCH_SIZE
+    ) -> AsyncIterator[Row]:
+        """Yields the rows of a column statement through a server-side cursor.
+
+        Use it with plain column selects to avoid building ORM objects at all.
+        """
+        result = await self.session.stream(stmt.execution_options(yield_per=fetch_size))
+        async for row in result:
+            yield row
+
     async def count(self) -> int:
         result = await self.session.execute(select(func.count()).select_from(self.model))
         return result.scalar_one()
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from app.db.database import async_session
 from app.repositories.cars import CarsRepository
 from app.repositories.parkings import ParkingRepository
+from app.repositories.parking_lots import ParkingLotRepository
 from app.repositories.users import UsersRepository
 from app.repositories.payments import PaymentRepository
 from app.repositories.rates import RateRepository
@@ -18,6 +19,7 @@ class IUnitOfWork(ABC):
     users: UsersRepository
     cars: CarsRepository
     parkings: ParkingRepository
+    parking_lots: ParkingLotRepository
     payments: PaymentRepository
     rates: RateRepository
     black_list: BlackListRepository
@@ -49,6 +51,7 @@ class UnitOfWork(IUnitOfWork):
         self.users = UsersRepository(self.session)
         self.cars = CarsRepository(self.session)
         self.parkings = ParkingRepository(self.session)
+        self.parking_lots = ParkingLotRepository(self.session)
         self.payments = PaymentRepository(self.session)
         self.rates = RateRepository(self.session)
         self.black_list = BlackListRepository(self.session)
@@ -0,0 +1,34 @@
+"""index parked cars
+
+Revision ID: a7d4e1f8b3c6
+Revises: f6c3d9e5a7b2
+Create Date: 2026-10-19 16:22:08.417302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a7d4e1f8b3c6'
+down_revision: Union[str, None] = 'f6c3d9e5a7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_cars_parked_since', 'cars', ['parked_since'], unique=False,
+            postgresql_where=sa.text('parked_since IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_cars_parked_since', table_name='cars',
+            postgresql_concurrently=True, if_exists=True,
+        )
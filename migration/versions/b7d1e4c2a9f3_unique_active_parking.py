@@ -0,0 +1,40 @@
+"""unique active parking per car
+
+Revision ID: b7d1e4c2a9f3
+Revises: a5fefb596829
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'b7d1e4c2a9f3'
+down_revision: Union[str, None] = 'a5fefb596829'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Close duplicate active sessions left by earlier races, keeping the latest one per car
+    op.execute(
+        """
+        UPDATE parkings SET is_active = false, end_time = start_time
+        WHERE is_active AND id NOT IN (
+            SELECT max(id) FROM parkings WHERE is_active GROUP BY car_id
+        )
+        """
+    )
+    op.create_index(
+        'uq_parkings_car_id_active',
+        'parkings',
+        ['car_id'],
+        unique=True,
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_parkings_car_id_active', table_name='parkings')
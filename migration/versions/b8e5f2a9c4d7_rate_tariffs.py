@@ -0,0 +1,26 @@
+"""rate tariffs
+
+Revision ID: b8e5f2a9c4d7
+Revises: a7d4e1f8b3c6
+Create Date: 2026-10-19 17:48:31.905126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'b8e5f2a9c4d7'
+down_revision: Union[str, None] = 'a7d4e1f8b3c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('rates', sa.Column('tariff', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('rates', 'tariff')
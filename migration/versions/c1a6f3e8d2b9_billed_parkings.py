@@ -0,0 +1,29 @@
+"""billed parkings
+
+Revision ID: c1a6f3e8d2b9
+Revises: b8e5f2a9c4d7
+Create Date: 2026-10-19 19:12:07.418263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c1a6f3e8d2b9'
+down_revision: Union[str, None] = 'b8e5f2a9c4d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('parkings', sa.Column('billed', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.execute(
+        "UPDATE parkings SET billed = true "
+        "WHERE EXISTS (SELECT 1 FROM payments WHERE payments.parking_id = parkings.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('parkings', 'billed')
@@ -0,0 +1,45 @@
+"""unique payment per parking
+
+Revision ID: c3f8a1d6e2b4
+Revises: b7d1e4c2a9f3
+Create Date: 2026-10-19 10:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c3f8a1d6e2b4'
+down_revision: Union[str, None] = 'b7d1e4c2a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicate payments left by earlier double billing, keeping the first one per parking,
+    # and refund the duplicates to the car owners
+    op.execute(
+        """
+        WITH duplicates AS (
+            DELETE FROM payments
+            WHERE parking_id IS NOT NULL AND id NOT IN (
+                SELECT min(id) FROM payments WHERE parking_id IS NOT NULL GROUP BY parking_id
+            )
+            RETURNING car_id, amount
+        ),
+        refunds AS (
+            SELECT cars.owner_id, sum(duplicates.amount) AS amount
+            FROM duplicates JOIN cars ON cars.id = duplicates.car_id
+            GROUP BY cars.owner_id
+        )
+        UPDATE users SET balance = users.balance + refunds.amount
+        FROM refunds WHERE users.id = refunds.owner_id
+        """
+    )
+    op.create_unique_constraint('uq_payments_parking_id', 'payments', ['parking_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_payments_parking_id', 'payments', type_='unique')
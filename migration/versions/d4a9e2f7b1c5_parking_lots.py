@@ -0,0 +1,39 @@
+"""parking lots
+
+Revision ID: d4a9e2f7b1c5
+Revises: c3f8a1d6e2b4
+Create Date: 2026-10-19 11:24:08.317245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd4a9e2f7b1c5'
+down_revision: Union[str, None] = 'c3f8a1d6e2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('parking_lots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('capacity', sa.Integer(), nullable=False),
+    sa.Column('occupied', sa.Integer(), server_default='0', nullable=False),
+    sa.CheckConstraint('occupied >= 0 AND occupied <= capacity', name='ck_parking_lots_occupied'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_parking_lots_id'), 'parking_lots', ['id'], unique=False)
+    op.add_column('parkings', sa.Column('lot_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('parkings_lot_id_fkey', 'parkings', 'parking_lots', ['lot_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('parkings_lot_id_fkey', 'parkings', type_='foreignkey')
+    op.drop_column('parkings', 'lot_id')
+    op.drop_index(op.f('ix_parking_lots_id'), table_name='parking_lots')
+    op.drop_table('parking_lots')
@@ -0,0 +1,49 @@
+"""hot path indexes
+
+Revision ID: e5b2c8d4f6a1
+Revises: d4a9e2f7b1c5
+Create Date: 2026-10-19 12:41:55.082613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e5b2c8d4f6a1'
+down_revision: Union[str, None] = 'd4a9e2f7b1c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs filtered on by the repositories
+INDEXES = [
+    ('cars', 'owner_id'),
+    ('parkings', 'car_id'),
+    ('parkings', 'start_time'),
+    ('parkings', 'end_time'),
+    ('payments', 'car_id'),
+    ('payments', 'payment_date'),
+    ('transactions', 'user_id'),
+    ('transactions', 'created_at'),
+    ('black_list', 'car_id'),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock the tables against writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.create_index(
+                op.f(f'ix_{table}_{column}'), table, [column], unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, column in INDEXES:
+            op.drop_index(
+                op.f(f'ix_{table}_{column}'), table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,191 @@
+"""partition parkings and payments by month
+
+Revision ID: f6c3d9e5a7b2
+Revises: e5b2c8d4f6a1
+Create Date: 2026-10-19 14:05:37.629140
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f6c3d9e5a7b2'
+down_revision: Union[str, None] = 'e5b2c8d4f6a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions are created this many months ahead; later ones come from the maintenance job
+MONTHS_AHEAD = 3
+
+PARKING_COLUMNS = 'id, car_id, lot_id, is_active, start_time, end_time'
+PAYMENT_COLUMNS = 'id, car_id, parking_id, amount, payment_date, description'
+
+
+def create_monthly_partitions(table: str, column: str) -> None:
+    # One partition per month from the oldest row up to MONTHS_AHEAD months from now, and a default partition
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', LEAST(COALESCE((SELECT min({column}) FROM {table}_unpartitioned), now()), now())),
+                    date_trunc('month', now()) + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                    '{table}_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+        """
+    )
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+
+def swap_table(table: str, columns: str) -> None:
+    # Moves the rows into the new table and hands the id sequence over to it
+    op.execute(f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {table}_unpartitioned')
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY NONE')
+    op.execute(f'DROP TABLE {table}_unpartitioned')
+    op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+
+def upgrade() -> None:
+    # One active session per car is now claimed on the car row instead of a partial unique index
+    op.add_column('cars', sa.Column('parked_since', sa.DateTime(), nullable=True))
+    op.execute(
+        """
+        UPDATE cars SET parked_since = parkings.start_time
+        FROM parkings WHERE parkings.car_id = cars.id AND parkings.is_active
+        """
+    )
+
+    # Unique constraints and foreign keys to a partitioned table must include the partition key
+    op.drop_constraint('payments_parking_id_fkey', 'payments', type_='foreignkey')
+    op.drop_constraint('uq_payments_parking_id', 'payments', type_='unique')
+    op.drop_index('uq_parkings_car_id_active', table_name='parkings')
+
+    op.rename_table('parkings', 'parkings_unpartitioned')
+    op.execute('ALTER TABLE parkings_unpartitioned RENAME CONSTRAINT parkings_pkey TO parkings_unpartitioned_pkey')
+    for index in ('ix_parkings_id', 'ix_parkings_car_id', 'ix_parkings_start_time', 'ix_parkings_end_time'):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(
+        """
+        CREATE TABLE parkings (
+            id INTEGER NOT NULL,
+            car_id INTEGER NOT NULL REFERENCES cars (id),
+            lot_id INTEGER REFERENCES parking_lots (id),
+            is_active BOOLEAN NOT NULL,
+            start_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            end_time TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT parkings_pkey PRIMARY KEY (id, start_time)
+        ) PARTITION BY RANGE (start_time)
+        """
+    )
+    create_monthly_partitions('parkings', 'start_time')
+    swap_table('parkings', PARKING_COLUMNS)
+    op.create_index(op.f('ix_parkings_id'), 'parkings', ['id'], unique=False)
+    op.create_index(op.f('ix_parkings_car_id'), 'parkings', ['car_id'], unique=False)
+    op.create_index(op.f('ix_parkings_start_time'), 'parkings', ['start_time'], unique=False)
+    op.create_index(op.f('ix_parkings_end_time'), 'parkings', ['end_time'], unique=False)
+
+    op.rename_table('payments', 'payments_unpartitioned')
+    op.execute('ALTER TABLE payments_unpartitioned RENAME CONSTRAINT payments_pkey TO payments_unpartitioned_pkey')
+    for index in ('ix_payments_id', 'ix_payments_car_id', 'ix_payments_payment_date'):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(
+        """
+        CREATE TABLE payments (
+            id INTEGER NOT NULL,
+            car_id INTEGER NOT NULL REFERENCES cars (id),
+            parking_id INTEGER,
+            amount FLOAT NOT NULL,
+            payment_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            description VARCHAR(255),
+            CONSTRAINT payments_pkey PRIMARY KEY (id, payment_date)
+        ) PARTITION BY RANGE (payment_date)
+        """
+    )
+    create_monthly_partitions('payments', 'payment_date')
+    swap_table('payments', PAYMENT_COLUMNS)
+    op.create_index(op.f('ix_payments_id'), 'payments', ['id'], unique=False)
+    op.create_index(op.f('ix_payments_car_id'), 'payments', ['car_id'], unique=False)
+    op.create_index(op.f('ix_payments_parking_id'), 'payments', ['parking_id'], unique=False)
+    op.create_index(op.f('ix_payments_payment_date'), 'payments', ['payment_date'], unique=False)
+
+
+def downgrade() -> None:
+    # Detached partitions are not merged back
+    op.rename_table('payments', 'payments_partitioned')
+    op.execute('ALTER TABLE payments_partitioned RENAME CONSTRAINT payments_pkey TO payments_partitioned_pkey')
+    for index in ('ix_payments_id', 'ix_payments_car_id', 'ix_payments_parking_id', 'ix_payments_payment_date'):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(
+        """
+        CREATE TABLE payments (
+            id INTEGER NOT NULL,
+            car_id INTEGER NOT NULL REFERENCES cars (id),
+            parking_id INTEGER,
+            amount FLOAT NOT NULL,
+            payment_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            description VARCHAR(255),
+            CONSTRAINT payments_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f'INSERT INTO payments ({PAYMENT_COLUMNS}) SELECT {PAYMENT_COLUMNS} FROM payments_partitioned')
+    op.execute('ALTER SEQUENCE payments_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE payments_partitioned')
+    op.execute("ALTER TABLE payments ALTER COLUMN id SET DEFAULT nextval('payments_id_seq')")
+    op.execute('ALTER SEQUENCE payments_id_seq OWNED BY payments.id')
+    op.create_index(op.f('ix_payments_id'), 'payments', ['id'], unique=False)
+    op.create_index(op.f('ix_payments_car_id'), 'payments', ['car_id'], unique=False)
+    op.create_index(op.f('ix_payments_payment_date'), 'payments', ['payment_date'], unique=False)
+
+    op.rename_table('parkings', 'parkings_partitioned')
+    op.execute('ALTER TABLE parkings_partitioned RENAME CONSTRAINT parkings_pkey TO parkings_partitioned_pkey')
+    for index in ('ix_parkings_id', 'ix_parkings_car_id', 'ix_parkings_start_time', 'ix_parkings_end_time'):
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+    op.execute(
+        """
+        CREATE TABLE parkings (
+            id INTEGER NOT NULL,
+            car_id INTEGER NOT NULL REFERENCES cars (id),
+            lot_id INTEGER REFERENCES parking_lots (id),
+            is_active BOOLEAN NOT NULL,
+            start_time TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            end_time TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT parkings_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f'INSERT INTO parkings ({PARKING_COLUMNS}) SELECT {PARKING_COLUMNS} FROM parkings_partitioned')
+    op.execute('ALTER SEQUENCE parkings_id_seq OWNED BY NONE')
+    op.execute('DROP TABLE parkings_partitioned')
+    op.execute("ALTER TABLE parkings ALTER COLUMN id SET DEFAULT nextval('parkings_id_seq')")
+    op.execute('ALTER SEQUENCE parkings_id_seq OWNED BY parkings.id')
+    op.create_index(op.f('ix_parkings_id'), 'parkings', ['id'], unique=False)
+    op.create_index(op.f('ix_parkings_car_id'), 'parkings', ['car_id'], unique=False)
+    op.create_index(op.f('ix_parkings_start_time'), 'parkings', ['start_time'], unique=False)
+    op.create_index(op.f('ix_parkings_end_time'), 'parkings', ['end_time'], unique=False)
+    op.create_index(
+        'uq_parkings_car_id_active',
+        'parkings',
+        ['car_id'],
+        unique=True,
+        postgresql_where=sa.text('is_active'),
+    )
+
+    op.create_unique_constraint('uq_payments_parking_id', 'payments', ['parking_id'])
+    op.create_foreign_key('payments_parking_id_fkey', 'payments', 'parkings', ['parking_id'], ['id'])
+    op.drop_column('cars', 'parked_since')